@@ -0,0 +1,40 @@
+# Constantes partagées par les étapes de préparation des données (cf. page 2 de streamlit_CO2.py)
+
+# colonnes conservées du dataset brut de l'EEA
+values_to_keep = ['Tan', 'T', 'Va', 'Mk', 'Cn', 'Ct', 'm (kg)', 'Enedc (g/km)', 'Ewltp (g/km)', 'W (mm)', 'At1 (mm)', 'Ft', 'Fm', 'ec (cm3)', 'ep (KW)', 'year']
+
+# colonnes texte / numériques du dataset brut
+raw_str_columns = ['Country', 'Tan', 'T', 'Va', 'Mk', 'Cn', 'Ct', 'Ft', 'Fm']
+raw_num_columns = ['m (kg)', 'Enedc (g/km)', 'Ewltp (g/km)', 'W (mm)', 'At1 (mm)', 'ec (cm3)', 'ep (KW)']
+
+# colonnes de partitionnement du dataset parquet
+partition_cols = ['year', 'Country']
+
+# périmètre de l'étude
+years = range(2017, 2023)
+countries = ['FR']
+excluded_fuels = ['ELECTRIC', 'HYDROGEN']
+
+# renommage final des colonnes
+Colname_mapping = {'Tan': 'Type_approval_number',
+                   'T': 'Type',
+                   'Va': 'Variant',
+                   'Mk': 'Make',
+                   'Cn': 'Commercial_name',
+                   'Ct': 'Category_vehicle_type_approved',
+                   'm (kg)': 'Mass_kg',
+                   'W (mm)': 'Wheel_Base_(length_mm)',
+                   'At1 (mm)': 'Track_(width_mm)',
+                   'Ft': 'Fuel_type',
+                   'Fm': 'Fuel_mode',
+                   'ec (cm3)': 'Engine_capacity_cm3',
+                   'ep (KW)': 'Engine_power_KW',
+                   'year': 'Reporting_year'}
+
+# libellés des pays du dataset de l'EEA (UE, Islande, Norvège) et du modèle européen commun
+country_names = {'AT': 'Autriche', 'BE': 'Belgique', 'BG': 'Bulgarie', 'CY': 'Chypre', 'CZ': 'Tchéquie',
+                 'DE': 'Allemagne', 'DK': 'Danemark', 'EE': 'Estonie', 'ES': 'Espagne', 'FI': 'Finlande',
+                 'FR': 'France', 'GR': 'Grèce', 'HR': 'Croatie', 'HU': 'Hongrie', 'IE': 'Irlande', 'IS': 'Islande',
+                 'IT': 'Italie', 'LT': 'Lituanie', 'LU': 'Luxembourg', 'LV': 'Lettonie', 'MT': 'Malte',
+                 'NL': 'Pays-Bas', 'NO': 'Norvège', 'PL': 'Pologne', 'PT': 'Portugal', 'RO': 'Roumanie',
+                 'SE': 'Suède', 'SI': 'Slovénie', 'SK': 'Slovaquie', 'EU': 'Union européenne (modèle commun)'}
@@ -0,0 +1,250 @@
+# Cube d'agrégats de l'analyse exploratoire (page 1) : le dataset EEA nettoyé (Mk / Ft normalisés, doublons supprimés)
+# résumé par année × pays × carburant × constructeur. Les mesures sont stockées sous forme d'histogrammes exacts
+# (effectif de chaque valeur distincte, sans arrondi) qui se fusionnent par simple somme : comptages, médianes et
+# quantiles de n'importe quelle sélection sont recalculés en quelques millisecondes, sans relire les 80M lignes brutes.
+# Chaque ligne de counts est un groupe (année, pays, carburant, constructeur) numéroté ; les histogrammes et les couples
+# sont triés par numéro de groupe : une sélection filtre la petite table counts puis découpe des tranches contiguës.
+#
+# Construction à partir du dataset parquet de l'ingestion :
+#   python -m data_processing.cube data/eea_parquet --output streamlit_assets/eda_cube
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_processing.constants import values_to_keep
+from data_processing.dataset import iter_partition_chunks
+from data_processing.dedup import StreamingDeduplicator
+from data_processing.normalization import load_mapping, normalize
+
+cube_path = os.path.join('streamlit_assets', 'eda_cube')
+
+cube_keys = ['year', 'Country', 'Ft', 'Mk']
+cube_measures = ['Enedc (g/km)', 'Ewltp (g/km)', 'ec (cm3)', 'ep (KW)', 'm (kg)']
+pair_measures = ['Enedc (g/km)', 'Ewltp (g/km)']
+cube_tables = ['counts', 'histograms', 'pairs']
+
+# libellé des carburants / constructeurs manquants (la normalisation les remplace par NaN)
+missing_label = 'UNKNOWN'
+
+# fusion des agrégats partiels tous les `compact_every` morceaux pour borner la mémoire
+compact_every = 20
+
+
+def _cube_frame(df):
+  keys = df[cube_keys].copy()
+  for col in ['Ft', 'Mk']:
+    keys[col] = keys[col].astype(object).where(keys[col].notna(), missing_label)
+  return keys
+
+
+def _merge(frames, columns, value_columns):
+  df = pd.concat(frames, ignore_index=True)
+  return df.groupby(columns, sort=False)[value_columns].sum().reset_index()
+
+
+# regroupement des petits morceaux (un par fichier de partition) : le coût fixe d'un morceau est payé moins souvent
+def _coalesce(chunks, min_rows):
+  buffer, n_rows = [], 0
+  for chunk in chunks:
+    buffer.append(chunk)
+    n_rows += len(chunk)
+    if n_rows >= min_rows:
+      yield pd.concat(buffer, ignore_index=True)
+      buffer, n_rows = [], 0
+  if buffer:
+    yield pd.concat(buffer, ignore_index=True)
+
+
+# agrégats d'un morceau : véhicules (lignes brutes), variantes (lignes uniques), histogrammes et couples Enedc / Ewltp
+def _chunk_aggregates(chunk, deduplicator, mapping):
+  chunk = normalize(chunk, mapping)
+  unique = deduplicator.process(chunk)
+
+  vehicles = _cube_frame(chunk).value_counts(dropna=False).rename('vehicles')
+  variants = _cube_frame(unique).value_counts(dropna=False).rename('variants')
+  counts = pd.concat([vehicles, variants], axis=1).fillna(0).astype('int64').reset_index()
+
+  # toutes les mesures dans une seule table (clés, mesure, valeur) : un seul comptage par morceau
+  keys = _cube_frame(unique)
+  values = unique[cube_measures].to_numpy(dtype='float64')
+  rows, measures = np.nonzero(~np.isnan(values))
+  long = keys.iloc[rows].reset_index(drop=True)
+  long['measure'] = np.asarray(cube_measures, dtype=object)[measures]
+  long['value'] = values[rows, measures]
+  histograms = long.value_counts(dropna=False).rename('n').reset_index()
+
+  both = unique[pair_measures].notna().all(axis=1).to_numpy()
+  pairs = keys[both].assign(**{measure: unique.loc[both, measure].to_numpy(dtype='float64') for measure in pair_measures})
+  pairs = pairs.value_counts(dropna=False).rename('n').reset_index()
+  return counts, histograms, pairs
+
+
+def _compact_dtypes(df):
+  df = df.copy()
+  df['year'] = df['year'].astype('int16')
+  for col in ['Country', 'Ft', 'Mk', 'measure']:
+    if col in df.columns:
+      df[col] = df[col].astype('category')
+  for col in ['vehicles', 'variants', 'n']:
+    if col in df.columns:
+      df[col] = df[col].astype('int32')
+  return df.sort_values([col for col in cube_keys + ['measure', 'value'] + pair_measures if col in df.columns], ignore_index=True)
+
+
+# numéro de groupe (colonne group) sur les trois tables, histogrammes et couples triés par groupe
+def _index_groups(counts, histograms, pairs):
+  counts = counts.assign(group=np.arange(len(counts), dtype='int32'))
+  groups = counts[cube_keys + ['group']].astype({col: object for col in cube_keys[1:]})
+
+  def indexed(table):
+    keys = table[cube_keys].astype({col: object for col in cube_keys[1:]})
+    group = keys.merge(groups, on=cube_keys, how='left')['group'].to_numpy()
+    return table.assign(group=group).sort_values('group', kind='stable', ignore_index=True)
+
+  return counts, indexed(histograms), indexed(pairs)
+
+
+# positions de toutes les lignes des intervalles [starts, ends)
+def _ranges(starts, ends):
+  lengths = ends - starts
+  offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+  return np.arange(lengths.sum()) + offsets
+
+
+# quantiles d'une distribution donnée par ses valeurs (triées) et leurs effectifs, avec l'interpolation linéaire de
+# pandas (Series.quantile) : résultat identique au calcul sur les lignes elles-mêmes
+def weighted_quantiles(values, counts, q):
+  cumulative = np.cumsum(counts)
+  positions = (cumulative[-1] - 1) * np.asarray(q, dtype='float64')
+  lower, upper = np.floor(positions), np.ceil(positions)
+  lower_values = values[np.searchsorted(cumulative, lower, side='right')]
+  upper_values = values[np.searchsorted(cumulative, upper, side='right')]
+  # interpolation de numpy.quantile, symétrique au-delà de la moitié de l'intervalle
+  t, diff = positions - lower, upper_values - lower_values
+  return np.where(t >= 0.5, upper_values - diff * (1 - t), lower_values + diff * t)
+
+
+# médiane comme Series.median : moyenne (a + b) / 2 des deux valeurs centrales, qui n'est pas toujours le même
+# flottant que l'interpolation du quantile 0.5
+def weighted_median(values, counts):
+  cumulative = np.cumsum(counts)
+  lower = values[np.searchsorted(cumulative, (cumulative[-1] - 1) // 2, side='right')]
+  upper = values[np.searchsorted(cumulative, cumulative[-1] // 2, side='right')]
+  return (lower + upper) / 2
+
+
+def quantile_name(q):
+  return f'p{q * 100:g}'
+
+
+class EdaCube:
+
+  def __init__(self, counts, histograms, pairs):
+    if 'group' not in counts.columns:
+      counts, histograms, pairs = _index_groups(counts, histograms, pairs)
+    self.counts = counts
+    self.histograms = histograms
+    self.pairs = pairs
+
+  # construction à partir de morceaux bruts (DataFrames au format EEA, colonne Country comprise)
+  @classmethod
+  def build(cls, chunks, mapping=None, min_rows=500_000):
+    if mapping is None:
+      mapping = load_mapping()
+    deduplicator = StreamingDeduplicator(values_to_keep + ['Country'])
+    parts = {name: [] for name in cube_tables}
+    value_columns = {'counts': ['vehicles', 'variants'], 'histograms': ['n'], 'pairs': ['n']}
+    group_columns = {'counts': cube_keys, 'histograms': cube_keys + ['measure', 'value'], 'pairs': cube_keys + pair_measures}
+
+    for i, chunk in enumerate(_coalesce(chunks, min_rows)):
+      for name, part in zip(cube_tables, _chunk_aggregates(chunk, deduplicator, mapping)):
+        parts[name].append(part)
+      if (i + 1) % compact_every == 0:
+        parts = {name: [_merge(frames, group_columns[name], value_columns[name])] for name, frames in parts.items()}
+
+    return cls(**{name: _compact_dtypes(_merge(frames, group_columns[name], value_columns[name]))
+                  for name, frames in parts.items()})
+
+  @classmethod
+  def load(cls, path=cube_path):
+    return cls(**{name: pd.read_parquet(os.path.join(path, f'{name}.parquet')) for name in cube_tables})
+
+  def save(self, path=cube_path):
+    os.makedirs(path, exist_ok=True)
+    for name in cube_tables:
+      getattr(self, name).to_parquet(os.path.join(path, f'{name}.parquet'), index=False)
+
+  def dimensions(self):
+    return {col: sorted(self.counts[col].unique().tolist()) for col in cube_keys}
+
+  # sous-cube restreint aux valeurs demandées (None = pas de filtre sur la dimension)
+  def select(self, years=None, countries=None, fuels=None, makes=None):
+    filters = {'year': years, 'Country': countries, 'Ft': fuels, 'Mk': makes}
+    mask = np.ones(len(self.counts), dtype=bool)
+    for col, values in filters.items():
+      if values is not None:
+        mask &= self.counts[col].isin(list(values)).to_numpy()
+    groups = self.counts['group'].to_numpy()[mask]
+    tables = {'counts': self.counts[mask]}
+    for name in ['histograms', 'pairs']:
+      table = getattr(self, name)
+      column = table['group'].to_numpy()
+      tables[name] = table.iloc[_ranges(np.searchsorted(column, groups, 'left'), np.searchsorted(column, groups, 'right'))]
+    return EdaCube(**tables)
+
+  # nombres de véhicules et de variantes par groupe
+  def totals(self, by):
+    return self.counts.groupby(by, observed=True)[['vehicles', 'variants']].sum()
+
+  # nombre de valeurs renseignées de chaque mesure par groupe (ex. Enedc / Ewltp par année)
+  def measure_counts(self, by, measures=cube_measures):
+    hist = self.histograms[self.histograms['measure'].isin(measures)]
+    table = hist.groupby(by + ['measure'], observed=True)['n'].sum().unstack('measure', fill_value=0)
+    return table.reindex(columns=[measure for measure in measures if measure in table.columns])
+
+  # quantiles d'une mesure par groupe (une ligne par groupe : count, p5, p25, p50, ...)
+  def quantiles(self, measure, by, q=(0.05, 0.25, 0.5, 0.75, 0.95)):
+    hist = self.histograms[self.histograms['measure'] == measure]
+    hist = hist.groupby(by + ['value'], observed=True)['n'].sum().reset_index()
+    rows = []
+    for key, group in hist.groupby(by, observed=True, sort=True):
+      counts = group['n'].to_numpy()
+      rows.append(list(key) + [int(counts.sum())] + list(weighted_quantiles(group['value'].to_numpy(), counts, q)))
+    return pd.DataFrame(rows, columns=by + ['count'] + [quantile_name(x) for x in q])
+
+  # couples (Enedc, Ewltp) des variantes qui ont les deux mesures, avec leurs effectifs
+  def measure_pairs(self, by=()):
+    return self.pairs.groupby(list(by) + pair_measures, observed=True)['n'].sum().reset_index()
+
+
+def build_cube(root, years=None, countries=None, batch_size=500_000):
+  if years is None:
+    years = range(2010, 2024)
+  chunks = iter_partition_chunks(root, years, countries, columns=values_to_keep + ['Country'], batch_size=batch_size)
+  return EdaCube.build(chunks, min_rows=batch_size)
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Construction du cube d'agrégats de l'analyse exploratoire")
+  parser.add_argument('dataset', help="répertoire du dataset parquet écrit par import.ingest_eea")
+  parser.add_argument('--output', default=cube_path)
+  parser.add_argument('--first-year', type=int, default=2010)
+  parser.add_argument('--last-year', type=int, default=2023)
+  parser.add_argument('--countries', default=None, help="codes pays séparés par des virgules (tous par défaut)")
+  parser.add_argument('--batch-size', type=int, default=500_000)
+  args = parser.parse_args()
+
+  start = time.perf_counter()
+  countries = args.countries.split(',') if args.countries else None
+  cube = build_cube(args.dataset, range(args.first_year, args.last_year + 1), countries, args.batch_size)
+  cube.save(args.output)
+  size = sum(os.path.getsize(os.path.join(args.output, f'{name}.parquet')) for name in cube_tables)
+  print(f"{int(cube.counts['vehicles'].sum())} véhicules, {int(cube.counts['variants'].sum())} variantes uniques, "
+        f"{len(cube.counts)} cellules -> {args.output} ({size // 1024} Ko) en {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,43 @@
+# Accès au dataset EEA partitionné (parquet, partitions year=.../Country=...)
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from data_processing.constants import raw_str_columns, raw_num_columns, years, countries
+
+# schéma commun à tous les fichiers écrits par l'ingestion
+eea_schema = pa.schema([(col, pa.string()) for col in raw_str_columns]
+                       + [(col, pa.float64()) for col in raw_num_columns]
+                       + [('year', pa.int16())])
+
+eea_partitioning = ds.partitioning(pa.schema([('year', pa.int16()), ('Country', pa.string())]), flavor='hive')
+
+
+def open_eea_dataset(root):
+  return ds.dataset(root, format='parquet', partitioning=eea_partitioning)
+
+
+# filtre sur les colonnes de partition : seuls les fichiers concernés sont lus
+def partition_filter(years=years, countries=countries):
+  expr = ds.field('year').isin(list(years))
+  if countries is not None:
+    expr = expr & ds.field('Country').isin(list(countries))
+  return expr
+
+
+def read_partitions(root, years=years, countries=countries, columns=None):
+  dataset = open_eea_dataset(root)
+  return dataset.to_table(columns=columns, filter=partition_filter(years, countries)).to_pandas()
+
+
+# lecture par morceaux de taille bornée (DataFrames pandas)
+def iter_partition_chunks(root, years=years, countries=countries, columns=None, batch_size=500_000):
+  dataset = open_eea_dataset(root)
+  for batch in dataset.to_batches(columns=columns, filter=partition_filter(years, countries), batch_size=batch_size):
+    if batch.num_rows:
+      yield batch.to_pandas()
+
+
+# liste des fichiers touchés par un filtre (utile pour vérifier l'élagage des partitions)
+def partition_files(root, years=years, countries=countries):
+  dataset = open_eea_dataset(root)
+  return [fragment.path for fragment in dataset.get_fragments(filter=partition_filter(years, countries))]
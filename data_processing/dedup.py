@@ -0,0 +1,81 @@
+# Suppression des doublons en flux : chaque ligne est résumée par une empreinte de 64 bits et seules les
+# empreintes déjà vues restent en mémoire (~230K lignes uniques au lieu des 11M lignes brutes).
+# Probabilité de collision pour 11M lignes : ~n²/2^65, soit environ 3e-6.
+import numpy as np
+import pandas as pd
+
+from data_processing.constants import values_to_keep, raw_num_columns
+
+
+# types stables d'un morceau à l'autre : une même valeur doit toujours donner la même empreinte
+def _stable_keys(df, columns):
+  keys = df[columns].copy()
+  for col in columns:
+    if col in raw_num_columns or col == 'year':
+      keys[col] = keys[col].astype('float64')
+    elif pd.api.types.is_numeric_dtype(keys[col]):
+      # colonne texte entièrement vide dans ce morceau
+      keys[col] = keys[col].astype(object)
+  return keys
+
+
+def row_fingerprints(df, columns=values_to_keep):
+  return pd.util.hash_pandas_object(_stable_keys(df, columns), index=False).to_numpy()
+
+
+# appartenance de chaque valeur à un tableau trié
+def _in_sorted(sorted_values, values):
+  if not len(sorted_values):
+    return np.zeros(len(values), dtype=bool)
+  positions = np.minimum(np.searchsorted(sorted_values, values), len(sorted_values) - 1)
+  return sorted_values[positions] == values
+
+
+class StreamingDeduplicator:
+
+  def __init__(self, columns=values_to_keep):
+    self.columns = columns
+    self._seen = np.empty(0, dtype='uint64')
+    self._chunk_stats = []
+    self._year_stats = {}
+
+  # renvoie les lignes du morceau qui n'ont encore jamais été vues (première occurrence conservée)
+  def process(self, chunk):
+    hashes = row_fingerprints(chunk, self.columns)
+    duplicated = _in_sorted(self._seen, hashes) | pd.Series(hashes).duplicated().to_numpy()
+    self._seen = np.sort(np.concatenate([self._seen, hashes[~duplicated]]))
+
+    self._chunk_stats.append({'chunk': len(self._chunk_stats), 'rows': len(chunk),
+                              'duplicates': int(duplicated.sum()), 'unique_seen': len(self._seen)})
+    if 'year' in chunk.columns:
+      by_year = pd.DataFrame({'year': chunk['year'].to_numpy(), 'duplicates': duplicated}).groupby('year')['duplicates'].agg(['size', 'sum'])
+      for year, (rows, duplicates) in by_year.iterrows():
+        stats = self._year_stats.setdefault(int(year), {'rows': 0, 'duplicates': 0})
+        stats['rows'] += int(rows)
+        stats['duplicates'] += int(duplicates)
+
+    return chunk[~duplicated]
+
+  def chunk_report(self):
+    return pd.DataFrame(self._chunk_stats, columns=['chunk', 'rows', 'duplicates', 'unique_seen'])
+
+  def year_report(self):
+    report = pd.DataFrame.from_dict(self._year_stats, orient='index', columns=['rows', 'duplicates'])
+    report.index.name = 'year'
+    report['unique'] = report['rows'] - report['duplicates']
+    return report.sort_index()
+
+
+def dedup_chunks(chunks, deduplicator):
+  for chunk in chunks:
+    unique = deduplicator.process(chunk)
+    if len(unique):
+      yield unique
+
+
+# équivalent en flux de df.drop_duplicates() : seules les lignes uniques sont concaténées
+def drop_duplicates_streaming(chunks, columns=values_to_keep):
+  deduplicator = StreamingDeduplicator(columns)
+  parts = list(dedup_chunks(chunks, deduplicator))
+  df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=columns)
+  return df, deduplicator
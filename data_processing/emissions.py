@@ -0,0 +1,60 @@
+# Construction de la variable cible CO2_Emissions à partir de 'Enedc (g/km)' et 'Ewltp (g/km)'
+import numpy as np
+import pandas as pd
+
+
+# médianes Enedc / Ewltp pour chaque type de carburant
+def compute_medians(df):
+  grouped = df.groupby('Ft', observed=True)
+  medians_enedc = grouped['Enedc (g/km)'].median()
+  medians_ewltp = grouped['Ewltp (g/km)'].median()
+  return medians_enedc, medians_ewltp
+
+
+# fonction d'origine appliquée ligne par ligne (conservée comme référence)
+def calculate_emissions(row, medians_enedc, medians_ewltp):
+  if not np.isnan(row['Ewltp (g/km)']):
+    return row['Ewltp (g/km)']
+  else:
+    fuel_type = row['Ft']
+    median_enedc = medians_enedc.get(fuel_type, 0)
+    median_ewltp = medians_ewltp.get(fuel_type, 0)
+    adjustment = median_enedc - median_ewltp
+    return row['Enedc (g/km)'] - adjustment
+
+
+# table d'ajustement par carburant : médiane Enedc - médiane Ewltp
+# un carburant absent d'une des deux séries compte pour 0 (comme medians.get(fuel_type, 0)),
+# une médiane NaN reste NaN
+def adjustment_table(medians_enedc, medians_ewltp):
+  index = medians_enedc.index.union(medians_ewltp.index)
+  enedc = medians_enedc.reindex(index, fill_value=0).astype('float64')
+  ewltp = medians_ewltp.reindex(index, fill_value=0).astype('float64')
+  return enedc - ewltp
+
+
+# ajustement de chaque ligne : une recherche par valeur distincte de 'Ft', 0 pour un carburant inconnu ou NaN
+# (position -1 = dernier élément : un 0.0 est ajouté en fin de tableau, y compris quand la table est vide)
+def _row_adjustments(ft, table):
+  values = np.append(table.to_numpy(dtype='float64'), 0.0)
+  if isinstance(ft.dtype, pd.CategoricalDtype):
+    per_category = np.append(values[table.index.get_indexer(ft.cat.categories)], 0.0)
+    return per_category[ft.cat.codes.to_numpy()]
+  return values[table.index.get_indexer(ft)]
+
+
+# équivalent vectorisé de df.apply(calculate_emissions, axis=1) : résultat identique au bit près
+def co2_emissions(df, medians_enedc=None, medians_ewltp=None):
+  if medians_enedc is None or medians_ewltp is None:
+    medians_enedc, medians_ewltp = compute_medians(df)
+  adjustment = _row_adjustments(df['Ft'], adjustment_table(medians_enedc, medians_ewltp))
+  ewltp = df['Ewltp (g/km)'].to_numpy(dtype='float64')
+  enedc = df['Enedc (g/km)'].to_numpy(dtype='float64')
+  return pd.Series(np.where(np.isnan(ewltp), enedc - adjustment, ewltp), index=df.index, name='CO2_Emissions')
+
+
+# ajout de CO2_Emissions et suppression des colonnes d'origine
+def add_co2_emissions(df, medians_enedc=None, medians_ewltp=None):
+  df = df.copy()
+  df['CO2_Emissions'] = co2_emissions(df, medians_enedc, medians_ewltp)
+  return df.drop(['Enedc (g/km)', 'Ewltp (g/km)'], axis=1)
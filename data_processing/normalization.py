@@ -0,0 +1,60 @@
+# Standardisation des variables 'Mk' (constructeur) et 'Ft' (carburant).
+# Le nettoyage (majuscules, espaces, alias) est fait une seule fois par valeur distincte puis les codes de la
+# catégorie sont remappés : quelques centaines de valeurs à traiter au lieu de millions de lignes.
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+mappings_dir = os.path.join(os.path.dirname(__file__), 'mappings')
+
+
+def available_versions():
+  versions = []
+  for name in os.listdir(mappings_dir):
+    match = re.fullmatch(r'normalization_v(\d+)\.json', name)
+    if match:
+      versions.append(int(match.group(1)))
+  return sorted(versions)
+
+
+# chargement d'une table d'alias versionnée (la plus récente par défaut)
+def load_mapping(version=None):
+  if version is None:
+    version = available_versions()[-1]
+  with open(os.path.join(mappings_dir, f'normalization_v{version}.json'), encoding='utf-8') as f:
+    mapping = json.load(f)
+  mapping['columns'] = {col: {key.strip(): value for key, value in aliases.items()}
+                        for col, aliases in mapping['columns'].items()}
+  return mapping
+
+
+# une valeur manquante est traitée comme la chaîne 'NAN', comme le faisait astype(str) puis upper()
+def normalize_value(value, aliases):
+  text = str(value).upper().strip() if not pd.isna(value) else 'NAN'
+  return aliases.get(text, text)
+
+
+def normalize_column(series, aliases):
+  categorical = series.astype('category')
+  old_categories = list(categorical.cat.categories) + [np.nan]
+  normalized = [normalize_value(value, aliases) for value in old_categories]
+
+  new_categories = sorted({value for value in normalized if value is not None})
+  positions = {value: code for code, value in enumerate(new_categories)}
+  recode = np.array([positions.get(value, -1) for value in normalized])
+
+  # le code -1 (valeur manquante) pointe sur la dernière entrée de recode
+  codes = recode[categorical.cat.codes.to_numpy()]
+  return pd.Series(pd.Categorical.from_codes(codes, categories=new_categories), index=series.index, name=series.name)
+
+
+def normalize(df, mapping=None, columns=('Mk', 'Ft')):
+  if mapping is None:
+    mapping = load_mapping()
+  df = df.copy()
+  for col in columns:
+    df[col] = normalize_column(df[col], mapping['columns'].get(col, {}))
+  return df
@@ -0,0 +1,270 @@
+# Pipeline incrémental de la page 2 : chaque étape est mise en cache sous un hash de ses entrées (contenu des fichiers
+# de la partition, paramètres) et de son code. Une partition year / Country inchangée n'est jamais relue ; quand une
+# année est publiée ou corrigée, seules ses partitions sont retraitées.
+#
+#   partition  : filtre carburants, sélection des colonnes, normalisation Mk / Ft, doublons    (par partition)
+#   sketch     : histogramme exact des valeurs Enedc / Ewltp par carburant                      (par partition)
+#   dataset    : médianes issues des histogrammes fusionnés, CO2_Emissions, NaN, renommage     (global, léger)
+#
+# Les histogrammes sont des résumés fusionnables exacts : les médianes obtenues sont celles de
+# df.groupby('Ft').median() sur tout l'historique, sans relire les partitions déjà traitées.
+#
+# Les partitions à (re)traiter sont réparties sur un pool de processus (--workers, borné par le nombre de coeurs).
+#
+#   python -m data_processing.pipeline data/eea_parquet --output streamlit_assets/Dataset_Rendu2_cleaned.csv
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pyarrow.dataset as ds
+
+from data_processing import dedup, emissions, normalization
+from data_processing.constants import values_to_keep, Colname_mapping, years, countries, excluded_fuels
+from data_processing.cube import weighted_median
+from data_processing.dataset import open_eea_dataset, partition_filter, iter_partition_chunks
+from data_processing.normalization import load_mapping
+from data_processing.storage import compact_path, csv_path, write_compact
+
+cache_dir = os.path.join('data', 'pipeline_cache')
+output_path = csv_path
+
+sketch_measures = ['Enedc (g/km)', 'Ewltp (g/km)']
+
+
+def _sha256(*parts):
+  digest = hashlib.sha256()
+  for part in parts:
+    digest.update(part.encode('utf-8') if isinstance(part, str) else part)
+    digest.update(b'\0')
+  return digest.hexdigest()
+
+
+# hash du code source d'une étape (fonctions et modules dont elle dépend)
+def code_digest(*objects):
+  return _sha256(*[inspect.getsource(obj) for obj in objects])
+
+
+class StageCache:
+
+  def __init__(self, root=cache_dir):
+    self.root = root
+    self.stats = {}
+    self._manifest_path = os.path.join(root, 'files.json')
+    self._manifest = {}
+    if os.path.exists(self._manifest_path):
+      with open(self._manifest_path, encoding='utf-8') as f:
+        self._manifest = json.load(f)
+
+  # sha256 du contenu d'un fichier ; recalculé seulement si sa taille ou sa date de modification a changé
+  def file_digest(self, path):
+    stat = os.stat(path)
+    entry = self._manifest.get(path)
+    if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+      return entry['sha256']
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+      for block in iter(lambda: f.read(1 << 20), b''):
+        digest.update(block)
+    self._manifest[path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+    return digest.hexdigest()
+
+  def save_manifest(self):
+    os.makedirs(self.root, exist_ok=True)
+    # fichier temporaire propre au processus : plusieurs processus du pool peuvent écrire le manifeste
+    tmp_path = f'{self._manifest_path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+      json.dump(self._manifest, f)
+    os.replace(tmp_path, self._manifest_path)
+
+  def path(self, stage, key):
+    return os.path.join(self.root, stage, key[:2], f'{key}.parquet')
+
+  def exists(self, stage, key):
+    return os.path.exists(self.path(stage, key))
+
+  def load(self, stage, key):
+    return pd.read_parquet(self.path(stage, key))
+
+  # ajout des compteurs d'un autre cache sur le même répertoire (processus du pool)
+  def merge_stats(self, stats):
+    for stage, values in stats.items():
+      total = self.stats.setdefault(stage, {'hits': 0, 'misses': 0, 'seconds': 0.0})
+      for name, value in values.items():
+        total[name] += value
+
+  # sortie de l'étape lue depuis le cache, ou calculée puis écrite (écriture atomique)
+  def get_or_compute(self, stage, key, compute):
+    stats = self.stats.setdefault(stage, {'hits': 0, 'misses': 0, 'seconds': 0.0})
+    path = self.path(stage, key)
+    start = time.perf_counter()
+    if os.path.exists(path):
+      stats['hits'] += 1
+      result = pd.read_parquet(path)
+    else:
+      stats['misses'] += 1
+      result = compute()
+      os.makedirs(os.path.dirname(path), exist_ok=True)
+      result.to_parquet(path + '.tmp', index=False)
+      os.replace(path + '.tmp', path)
+    stats['seconds'] += time.perf_counter() - start
+    return result
+
+
+# fichiers de chaque partition (year, Country) du dataset parquet
+def list_partitions(root, years=years, countries=countries):
+  partitions = {}
+  for fragment in open_eea_dataset(root).get_fragments(filter=partition_filter(years, countries)):
+    keys = ds.get_partition_keys(fragment.partition_expression)
+    partitions.setdefault((int(keys['year']), keys['Country']), []).append(fragment.path)
+  return {partition: sorted(paths) for partition, paths in sorted(partitions.items())}
+
+
+# étape 'partition' : lignes uniques d'une partition, carburants exclus, Mk / Ft normalisés
+def clean_partition(root, year, country, mapping, fuels=excluded_fuels):
+  deduplicator = dedup.StreamingDeduplicator(values_to_keep)
+  unique = []
+  for chunk in iter_partition_chunks(root, [year], [country], columns=values_to_keep + ['Country']):
+    chunk = chunk[~chunk['Ft'].isin(fuels)][values_to_keep]
+    unique.append(deduplicator.process(normalization.normalize(chunk, mapping)))
+  if not unique:
+    return pd.DataFrame(columns=values_to_keep)
+  return pd.concat(unique, ignore_index=True)
+
+
+# étape 'sketch' : effectifs de chaque valeur Enedc / Ewltp par carburant, plus le nombre de lignes par carburant
+# (un carburant sans aucune valeur Ewltp a une médiane NaN, comme avec groupby('Ft').median())
+def sketch_partition(df):
+  rows = df.groupby('Ft', observed=True).size().rename('n').reset_index().assign(measure='rows', value=0.0)
+  sketches = [rows]
+  for measure in sketch_measures:
+    values = df[['Ft', measure]].dropna()
+    counts = values.groupby(['Ft', measure], observed=True).size().rename('n').reset_index()
+    sketches.append(counts.rename(columns={measure: 'value'}).assign(measure=measure))
+  sketch = pd.concat(sketches, ignore_index=True)
+  return sketch.astype({'Ft': str, 'value': 'float64', 'n': 'int64', 'measure': str})[['measure', 'Ft', 'value', 'n']]
+
+
+# médianes par carburant à partir des histogrammes de toutes les partitions (identiques à compute_medians)
+def merged_medians(sketches):
+  sketch = pd.concat(sketches, ignore_index=True).groupby(['measure', 'Ft', 'value'])['n'].sum().reset_index()
+  fuels = pd.Index(sorted(sketch.loc[sketch['measure'] == 'rows', 'Ft'].unique()), name='Ft')
+  medians = {}
+  for measure in sketch_measures:
+    rows = sketch[sketch['measure'] == measure]
+    values = {fuel: weighted_median(group['value'].to_numpy(), group['n'].to_numpy())
+              for fuel, group in rows.groupby('Ft')}
+    medians[measure] = pd.Series(values, dtype='float64', name=measure).reindex(fuels)
+  return medians['Enedc (g/km)'], medians['Ewltp (g/km)']
+
+
+# dataset de plusieurs pays : le dédoublonnage des partitions se fait pays par pays (Country ne fait pas partie de
+# values_to_keep), une variante immatriculée dans plusieurs pays n'est gardée qu'une fois dans l'union
+def union_partitions(partitions):
+  deduplicator = dedup.StreamingDeduplicator(values_to_keep)
+  return [deduplicator.process(df) for df in partitions]
+
+
+# étape 'dataset' : assemblage des partitions nettoyées, CO2_Emissions avec les médianes globales, NaN, renommage
+def assemble(partitions, medians_enedc, medians_ewltp):
+  df = pd.concat(partitions, ignore_index=True)
+  df = emissions.add_co2_emissions(df, medians_enedc, medians_ewltp)
+  return df.dropna(axis=0, how='any').rename(columns=Colname_mapping).reset_index(drop=True)
+
+
+# étapes 'partition' et 'sketch' d'une partition ; exécutée dans un processus du pool, les sorties sont écrites
+# dans le cache commun et seuls les compteurs sont renvoyés
+def _prepare_partition(cache_root, root, year, country, mapping, fuels, key, sketch_key):
+  cache = StageCache(cache_root)
+  df = cache.get_or_compute('partition', key, lambda: clean_partition(root, year, country, mapping, fuels))
+  cache.get_or_compute('sketch', sketch_key, lambda: sketch_partition(df))
+  return cache.stats
+
+
+# clés de cache des étapes 'partition' et 'sketch' de chaque partition (year, Country)
+def partition_keys(root, years=years, countries=countries, cache=None, mapping=None, fuels=excluded_fuels):
+  cache = cache or StageCache()
+  mapping = mapping or load_mapping()
+  params = json.dumps({'mapping': mapping, 'fuels': sorted(fuels), 'columns': values_to_keep}, sort_keys=True)
+  partition_code = code_digest(clean_partition, normalization, dedup)
+  sketch_code = code_digest(sketch_partition)
+  keys = {}
+  for (year, country), paths in list_partitions(root, years, countries).items():
+    inputs = [f'{os.path.relpath(path, root)}:{cache.file_digest(path)}' for path in paths]
+    key = _sha256(partition_code, params, str(year), country, *inputs)
+    keys[(year, country)] = (key, _sha256(sketch_code, key))
+  cache.save_manifest()
+  return keys
+
+
+# partitions absentes du cache nettoyées en parallèle (un processus par partition, au plus `workers`)
+def prepare_partitions(root, years=years, countries=countries, cache=None, mapping=None, fuels=excluded_fuels, workers=1):
+  cache = cache or StageCache()
+  mapping = mapping or load_mapping()
+  keys = partition_keys(root, years, countries, cache, mapping, fuels)
+  todo = [(partition, key, sketch_key) for partition, (key, sketch_key) in keys.items()
+          if not (cache.exists('partition', key) and cache.exists('sketch', sketch_key))]
+  cached = len(keys) - len(todo)
+  cache.merge_stats({'partition': {'hits': cached}, 'sketch': {'hits': cached}})
+  workers = min(workers or os.cpu_count(), os.cpu_count(), len(todo))
+  if workers > 1:
+    with ProcessPoolExecutor(workers) as executor:
+      futures = [executor.submit(_prepare_partition, cache.root, root, year, country, mapping, fuels, key, sketch_key)
+                 for (year, country), key, sketch_key in todo]
+      for future in futures:
+        cache.merge_stats(future.result())
+  else:
+    for (year, country), key, sketch_key in todo:
+      cache.merge_stats(_prepare_partition(cache.root, root, year, country, mapping, fuels, key, sketch_key))
+  return keys
+
+
+def run_pipeline(root, years=years, countries=countries, cache=None, mapping=None, fuels=excluded_fuels, workers=1):
+  cache = cache or StageCache()
+  keys = prepare_partitions(root, years, countries, cache, mapping, fuels, workers)
+  dataset_code = code_digest(union_partitions, sketch_partition, merged_medians, assemble, emissions, weighted_median)
+
+  # toutes les partitions sont maintenant dans le cache
+  cleaned = [cache.load('partition', key) for key, _ in keys.values()]
+  sketches = [cache.load('sketch', sketch_key) for _, sketch_key in keys.values()]
+  # plusieurs pays : doublons entre pays retirés avant les médianes et CO2_Emissions
+  if len({country for _, country in keys}) > 1:
+    cleaned = union_partitions(cleaned)
+    sketches = [sketch_partition(df) for df in cleaned]
+
+  if not cleaned:
+    raise ValueError(f"aucune partition de {root} pour les années {list(years)} et les pays {countries}")
+  medians_enedc, medians_ewltp = merged_medians(sketches)
+  result = cache.get_or_compute('dataset', _sha256(dataset_code, *[key for key, _ in keys.values()]),
+                                lambda: assemble(cleaned, medians_enedc, medians_ewltp))
+  return result, {'medians_enedc': medians_enedc, 'medians_ewltp': medians_ewltp, 'stages': cache.stats}
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Pipeline incrémental de préparation des données (page 2)")
+  parser.add_argument('dataset', help="répertoire du dataset parquet écrit par import.ingest_eea")
+  parser.add_argument('--output', default=output_path)
+  parser.add_argument('--compact-output', default=compact_path, help="copie compacte (Parquet) chargée par l'application")
+  parser.add_argument('--cache-dir', default=cache_dir)
+  parser.add_argument('--first-year', type=int, default=years.start)
+  parser.add_argument('--last-year', type=int, default=years.stop - 1)
+  parser.add_argument('--countries', default=','.join(countries), help="codes pays séparés par des virgules")
+  parser.add_argument('--workers', type=int, default=os.cpu_count(), help="processus pour les partitions à retraiter")
+  args = parser.parse_args()
+
+  start = time.perf_counter()
+  df, report = run_pipeline(args.dataset, range(args.first_year, args.last_year + 1), args.countries.split(','),
+                            StageCache(args.cache_dir), workers=args.workers)
+  df.to_csv(args.output, index=False)
+  write_compact(df, args.compact_output)
+  for stage, stats in report['stages'].items():
+    print(f"{stage:10s} {stats['hits']:4d} en cache, {stats['misses']:4d} recalculées ({stats['seconds']:.1f} s)")
+  print(f"{len(df)} lignes -> {args.output} en {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,70 @@
+# Stockage compact du dataset nettoyé : Parquet au lieu du CSV, avec
+# - colonnes texte en catégories (un dictionnaire par colonne, codes entiers par ligne)
+# - entiers réduits au plus petit type suffisant (Reporting_year en int16)
+# - mesures en float32 quand la conversion est exacte (sinon float64 : les calculs restent identiques au CSV)
+# Les types sont conservés dans le fichier Parquet, la relecture ne réanalyse rien.
+#
+# Conversion d'un dataset nettoyé existant (depuis la racine du projet) :
+#   python -m data_processing.storage streamlit_assets/Dataset_Rendu2_cleaned.csv
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+csv_path = os.path.join('streamlit_assets', 'Dataset_Rendu2_cleaned.csv')
+compact_path = os.path.join('streamlit_assets', 'Dataset_Rendu2_cleaned.parquet')
+
+
+def _compact_column(values):
+  if isinstance(values.dtype, pd.CategoricalDtype):
+    return values
+  if pd.api.types.is_string_dtype(values) or values.dtype == object:
+    return values.astype('category')
+  if pd.api.types.is_integer_dtype(values):
+    return pd.to_numeric(values, downcast='integer')
+  if pd.api.types.is_float_dtype(values):
+    compact = values.astype('float32')
+    if np.array_equal(compact.to_numpy(dtype='float64'), values.to_numpy(dtype='float64'), equal_nan=True):
+      return compact
+  return values
+
+
+def compact_frame(df):
+  return pd.DataFrame({col: _compact_column(values) for col, values in df.items()})
+
+
+def write_compact(df, path=compact_path):
+  compact_frame(df).to_parquet(path + '.tmp', index=False)
+  os.replace(path + '.tmp', path)
+
+
+# catégories sans aucune ligne retirées (ex. sur la partie entrainement d'un train_test_split) : les effectifs
+# calculés ensuite (fréquences de l'encodeur) ne contiennent pas de valeurs à 0
+def remove_unused_categories(df):
+  return df.assign(**{col: values.cat.remove_unused_categories() for col, values in df.items()
+                      if isinstance(values.dtype, pd.CategoricalDtype)})
+
+
+# dataset nettoyé au format compact, depuis le fichier Parquet ou à défaut depuis un CSV converti à la lecture
+def read_dataset(path):
+  if path.endswith('.parquet'):
+    return pd.read_parquet(path, memory_map=True)
+  return compact_frame(pd.read_csv(path, sep=','))
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Conversion du dataset nettoyé au format compact (Parquet)")
+  parser.add_argument('dataset', nargs='?', default=csv_path)
+  parser.add_argument('output', nargs='?', default=compact_path)
+  args = parser.parse_args()
+
+  df = pd.read_csv(args.dataset, sep=',')
+  write_compact(df, args.output)
+  compact = read_dataset(args.output)
+  print(f"{len(df)} lignes -> {args.output} ({os.path.getsize(args.output) // 1024} Ko) ; mémoire "
+        f"{df.memory_usage(deep=True).sum() // 1024} Ko -> {compact.memory_usage(deep=True).sum() // 1024} Ko")
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,107 @@
+# Ingestion du fichier brut de l'EEA (80M lignes) vers un dataset parquet partitionné par année et par pays.
+# Le CSV est lu par morceaux de taille fixe : la mémoire reste bornée quelle que soit la taille du fichier.
+# Chaque morceau écrit un fichier par partition ; en fin d'ingestion, les fichiers de chaque partition écrite sont
+# regroupés en un seul (lecture fichier par fichier, groupes de lignes d'au plus row_group_size lignes).
+#
+# Utilisation (depuis la racine du projet) :
+#   python -m import.ingest_eea data/eea_raw.csv data/eea_parquet
+#   python -m import.ingest_eea data/eea_2023.csv data/eea_parquet --update    # nouvelle année publiée
+import argparse
+import os
+import shutil
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from data_processing.constants import values_to_keep, raw_str_columns, raw_num_columns, partition_cols
+from data_processing.dataset import eea_schema
+
+
+def read_raw_chunks(path, chunksize=500_000, sep=',', encoding='utf-8'):
+  usecols = values_to_keep + ['Country']
+  dtype = {col: str for col in raw_str_columns}
+  dtype.update({col: 'float64' for col in raw_num_columns + ['year']})
+  for chunk in pd.read_csv(path, sep=sep, encoding=encoding, usecols=usecols, dtype=dtype,
+                           chunksize=chunksize, low_memory=True):
+    # sans année ou sans pays, la ligne ne peut pas être rangée dans une partition
+    chunk = chunk.dropna(subset=partition_cols)
+    chunk['year'] = chunk['year'].astype('int16')
+    yield chunk
+
+
+def partition_dir(output_dir, year, country):
+  return os.path.join(output_dir, f'year={year}', f'Country={country}')
+
+
+# regroupement des fichiers d'une partition en un seul ; le fichier temporaire commence par '.' et n'est donc jamais lu
+# comme une partie du dataset
+def compact_partition(directory, row_group_size=1_000_000):
+  files = sorted(name for name in os.listdir(directory) if name.endswith('.parquet'))
+  if len(files) <= 1:
+    return
+  tmp_path = os.path.join(directory, '.compact.tmp')
+  writer = None
+  for name in files:
+    # ParquetFile ne déduit pas les colonnes de partition du chemin (contrairement à pq.read_table)
+    table = pq.ParquetFile(os.path.join(directory, name)).read()
+    if writer is None:
+      writer = pq.ParquetWriter(tmp_path, table.schema)
+    writer.write_table(table, row_group_size=row_group_size)
+  writer.close()
+  for name in files:
+    os.remove(os.path.join(directory, name))
+  os.replace(tmp_path, os.path.join(directory, 'part-0.parquet'))
+
+
+# update=True : seules les partitions présentes dans le CSV (ex. une nouvelle année publiée) sont remplacées,
+# les autres partitions du dataset restent intactes (et en cache dans data_processing.pipeline)
+# progress : fonction appelée après chaque morceau avec (numéro du morceau, lignes écrites, lignes/s)
+def ingest(csv_path, output_dir, chunksize=500_000, sep=',', encoding='utf-8', overwrite=False, update=False,
+           progress=None):
+  if os.path.exists(output_dir) and not update:
+    if not overwrite:
+      raise FileExistsError(f"{output_dir} existe déjà (utiliser overwrite=True ou update=True)")
+    shutil.rmtree(output_dir)
+
+  start = time.perf_counter()
+  run_id = time.strftime('%Y%m%d%H%M%S')
+  rows = 0
+  written = set()
+  for i, chunk in enumerate(read_raw_chunks(csv_path, chunksize, sep, encoding)):
+    for year, country in chunk[partition_cols].drop_duplicates().itertuples(index=False):
+      if update and (year, country) not in written and os.path.exists(partition_dir(output_dir, year, country)):
+        shutil.rmtree(partition_dir(output_dir, year, country))
+      written.add((year, country))
+    table = pa.Table.from_pandas(chunk, schema=eea_schema, preserve_index=False)
+    pq.write_to_dataset(table, output_dir, partition_cols=partition_cols,
+                        basename_template=f"part-{run_id}-{i:05d}-{{i}}.parquet" if update else f"part-{i:05d}-{{i}}.parquet",
+                        existing_data_behavior='overwrite_or_ignore')
+    rows += len(chunk)
+    if progress is not None:
+      progress(i, rows, rows / (time.perf_counter() - start))
+
+  for year, country in written:
+    compact_partition(partition_dir(output_dir, year, country))
+  return {'rows': rows, 'seconds': time.perf_counter() - start, 'partitions': sorted(written)}
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Ingestion du CSV EEA vers un dataset parquet partitionné (year / Country)")
+  parser.add_argument('csv_path')
+  parser.add_argument('output_dir')
+  parser.add_argument('--chunksize', type=int, default=500_000)
+  parser.add_argument('--sep', default=',')
+  parser.add_argument('--encoding', default='utf-8')
+  parser.add_argument('--overwrite', action='store_true')
+  parser.add_argument('--update', action='store_true', help="remplace seulement les partitions présentes dans le CSV")
+  args = parser.parse_args()
+
+  summary = ingest(args.csv_path, args.output_dir, args.chunksize, args.sep, args.encoding, args.overwrite, args.update,
+                   progress=lambda i, rows, rate: print(f"morceau {i} : {rows} lignes écrites ({rate:.0f} lignes/s)"))
+  print(f"Ingestion terminée : {summary['rows']} lignes en {summary['seconds']:.1f} s")
+
+
+if __name__ == '__main__':
+  main()
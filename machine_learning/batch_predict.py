@@ -0,0 +1,149 @@
+# Prédiction en masse des émissions de CO2 d'une flotte de véhicules (CSV ou Parquet).
+# Le fichier est lu par morceaux, chaque morceau est encodé comme dans le calculateur (RobustScaler sur col_num,
+# fréquence de Fuel_type, ordre de col_list) puis prédit par un pool de processus ; les résultats sont écrits au fil de l'eau.
+#
+# Colonnes attendues : Fuel_type, Reporting_year et Engine_capacity_L (litres, comme le slider du calculateur)
+# ou à défaut Engine_capacity_cm3 ; Yearly_km est optionnelle (sinon --yearly-km).
+#
+# Utilisation (depuis la racine du projet) :
+#   python -m machine_learning.batch_predict flotte.parquet predictions.parquet --summary emissions_par_an.csv
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from machine_learning.encoders import encoder_path
+from machine_learning.registry import get_predictor, model_path
+
+# kilométrage annuel par défaut : valeur par défaut du calculateur (200 km par semaine)
+default_yearly_km = 200 * 52
+
+_predictor = None
+
+
+def iter_vehicle_chunks(path, chunksize=200_000):
+  if path.endswith('.parquet'):
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+      yield batch.to_pandas()
+  else:
+    yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def _engine_capacity_litres(chunk):
+  if 'Engine_capacity_L' in chunk.columns:
+    return chunk['Engine_capacity_L'].to_numpy(dtype='float64')
+  return chunk['Engine_capacity_cm3'].to_numpy(dtype='float64') / 1000
+
+
+def score_chunk(chunk, predictor, yearly_km=default_yearly_km):
+  result = chunk.copy()
+  result['CO2_g_km'] = predictor.predict(chunk['Fuel_type'].to_numpy(dtype=object), _engine_capacity_litres(chunk),
+                                         chunk['Reporting_year'].to_numpy())
+  km = chunk['Yearly_km'] if 'Yearly_km' in chunk.columns else yearly_km
+  result['Yearly_tonnes_CO2'] = result['CO2_g_km'].astype('float64') * km / 1000000
+  return result
+
+
+# un modèle par processus, chacun sur un seul thread : le parallélisme vient du pool
+def _init_worker(model_path, encoder_path):
+  global _predictor
+  _predictor = get_predictor(model_path, encoder_path)
+  _predictor.model.get_booster().set_param({'nthread': 1})
+
+
+def _score_in_worker(chunk, yearly_km):
+  return score_chunk(chunk, _predictor, yearly_km)
+
+
+# morceaux prédits dans l'ordre de lecture, avec au plus 2 morceaux en attente par processus
+def iter_scored_chunks(chunks, workers, yearly_km=default_yearly_km, model_path=model_path, encoder_path=encoder_path):
+  if workers <= 1:
+    predictor = get_predictor(model_path, encoder_path)
+    for chunk in chunks:
+      yield score_chunk(chunk, predictor, yearly_km)
+    return
+
+  with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(model_path, encoder_path)) as executor:
+    pending = deque()
+    for chunk in chunks:
+      pending.append(executor.submit(_score_in_worker, chunk, yearly_km))
+      if len(pending) >= 2 * workers:
+        yield pending.popleft().result()
+    while pending:
+      yield pending.popleft().result()
+
+
+class _ResultWriter:
+
+  def __init__(self, path):
+    self.path = path
+    self._parquet = None
+    self._first = True
+
+  def write(self, df):
+    if self.path.endswith('.parquet'):
+      table = pa.Table.from_pandas(df, preserve_index=False)
+      if self._parquet is None:
+        self._parquet = pq.ParquetWriter(self.path, table.schema)
+      self._parquet.write_table(table.cast(self._parquet.schema))
+    else:
+      df.to_csv(self.path, mode='w' if self._first else 'a', header=self._first, index=False)
+    self._first = False
+
+  def close(self):
+    if self._parquet is not None:
+      self._parquet.close()
+
+
+# progress : fonction appelée après chaque morceau avec (véhicules traités, véhicules/s)
+def predict_fleet(input_path, output_path, workers=None, chunksize=200_000, yearly_km=default_yearly_km,
+                  model_path=model_path, encoder_path=encoder_path, progress=None):
+  workers = workers or os.cpu_count()
+  writer = _ResultWriter(output_path)
+  yearly = []
+  rows = 0
+  start = time.perf_counter()
+  try:
+    scored = iter_scored_chunks(iter_vehicle_chunks(input_path, chunksize), workers, yearly_km, model_path, encoder_path)
+    for chunk in scored:
+      writer.write(chunk)
+      yearly.append(chunk.groupby('Reporting_year')['Yearly_tonnes_CO2'].agg(['size', 'sum']))
+      rows += len(chunk)
+      if progress is not None:
+        progress(rows, rows / (time.perf_counter() - start))
+  finally:
+    writer.close()
+
+  summary = pd.concat(yearly).groupby(level=0).sum() if yearly else pd.DataFrame(columns=['size', 'sum'])
+  summary.columns = ['Vehicles', 'Yearly_tonnes_CO2']
+  seconds = time.perf_counter() - start
+  return summary, {'rows': rows, 'seconds': seconds, 'rows_per_second': rows / seconds if seconds else 0.0}
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Prédiction des émissions de CO2 d'une flotte de véhicules")
+  parser.add_argument('input', help="fichier CSV ou Parquet des véhicules")
+  parser.add_argument('output', help="fichier CSV ou Parquet des prédictions")
+  parser.add_argument('--summary', help="fichier CSV des tonnes de CO2 par année d'immatriculation")
+  parser.add_argument('--workers', type=int, default=os.cpu_count())
+  parser.add_argument('--chunksize', type=int, default=200_000)
+  parser.add_argument('--yearly-km', type=float, default=default_yearly_km)
+  parser.add_argument('--model', default=model_path)
+  parser.add_argument('--encoder', default=encoder_path)
+  args = parser.parse_args()
+
+  summary, stats = predict_fleet(args.input, args.output, args.workers, args.chunksize, args.yearly_km, args.model, args.encoder,
+                                 progress=lambda rows, rate: print(f"{rows} véhicules traités ({rate:.0f} véhicules/s)"))
+  if args.summary:
+    summary.to_csv(args.summary)
+  print(summary)
+  print(f"{stats['rows']} véhicules en {stats['seconds']:.1f} s ({stats['rows_per_second']:.0f} véhicules/s)")
+
+
+if __name__ == '__main__':
+  main()
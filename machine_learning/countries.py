@@ -0,0 +1,156 @@
+# Modèles par pays et modèle européen commun : l'étude n'utilise que les véhicules français (constants.countries),
+# ce module applique la même préparation et le même modèle XGBoost à chaque pays du dataset parquet.
+# 1. nettoyage, doublons et histogrammes de chaque partition (year, Country) absente du cache, en parallèle
+#    (data_processing.pipeline.prepare_partitions, cache partagé avec la page 2)
+# 2. un processus par modèle : assemblage du dataset du pays (CO2_Emissions avec les médianes du pays) depuis le cache,
+#    encodeur ajusté sur les données d'entrainement, XGBoost sur un thread, surface du calculateur précalculée.
+#    Le modèle EU est entrainé sur l'union des pays, sans doublons entre pays (médianes de l'union).
+# Le nombre de processus est borné par le nombre de coeurs. Sorties : models/<version>/<code>/ et metrics.json,
+# --install les copie dans models/countries/ où le calculateur de la page 4 les propose.
+#
+# Utilisation (depuis la racine du projet) :
+#   python -m machine_learning.countries data/eea_parquet --workers 8 --install
+#   python -m machine_learning.countries data/eea_parquet --countries FR,DE,IT --params models/<version>/metrics.json
+import argparse
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+from sklearn.model_selection import train_test_split
+from threadpoolctl import threadpool_limits
+
+from data_processing.constants import years
+from data_processing.pipeline import StageCache, cache_dir, list_partitions, prepare_partitions, run_pipeline
+from data_processing.storage import remove_unused_categories
+from machine_learning.encoders import FeatureEncoder, encoder_path
+from machine_learning.features import target
+from machine_learning.lookup import PredictionSurface, surface_path
+from machine_learning.registry import CO2Predictor, countries_dir, file_sha256, model_path
+from machine_learning.train import make_model, models_dir, new_version_dir, scores
+
+eu_code = 'EU'
+
+# configuration du modèle de l'application quand aucun rapport d'entrainement n'est fourni (--params)
+default_params = {'learning_rate': 0.1, 'max_depth': 6}
+default_rounds = 100
+
+# en dessous, pas assez de variantes pour un modèle du pays (il reste couvert par le modèle EU)
+default_min_rows = 500
+
+
+# pays présents dans le dataset parquet sur la période
+def dataset_countries(root, years=years):
+  return sorted({country for _, country in list_partitions(root, years, None)})
+
+
+def _init_worker():
+  threadpool_limits(1)
+
+
+# entrainement d'un modèle (un pays ou l'union) dans un processus du pool ; les partitions sont déjà dans le cache
+def train_country(code, root, countries, years, cache_root, params, rounds, seed, min_rows, output_dir):
+  start = time.perf_counter()
+  df, report = run_pipeline(root, years, countries, StageCache(cache_root))
+  df = df.dropna(subset=[target])
+  if len(df) < min_rows:
+    return {'country': code, 'countries': countries, 'rows': len(df), 'skipped': True}
+
+  train_df, test_df = train_test_split(df, test_size=0.2, random_state=seed)
+  train_df = remove_unused_categories(train_df)
+  encoder = FeatureEncoder.from_dataframe(train_df)
+  X_train, y_train = encoder.encode_frame(train_df), train_df[target].to_numpy()
+  X_test, y_test = encoder.encode_frame(test_df), test_df[target].to_numpy()
+  model = make_model('XGBoost', params, seed, n_jobs=1, n_rounds=rounds)
+  model.fit(X_train, y_train)
+
+  country_dir = os.path.join(output_dir, code)
+  os.makedirs(country_dir, exist_ok=True)
+  joblib.dump(model, os.path.join(country_dir, model_path))
+  encoder.save(os.path.join(country_dir, encoder_path))
+  predictor = CO2Predictor(model, encoder, file_sha256(os.path.join(country_dir, model_path)),
+                           file_sha256(os.path.join(country_dir, encoder_path)))
+  PredictionSurface.build(predictor).save(os.path.join(country_dir, surface_path))
+  return {'country': code, 'countries': countries, 'rows': {'train': len(train_df), 'test': len(test_df)},
+          'medians_enedc': report['medians_enedc'].dropna().to_dict(),
+          'medians_ewltp': report['medians_ewltp'].dropna().to_dict(),
+          'seconds': time.perf_counter() - start, **scores(model, X_train, y_train, X_test, y_test)}
+
+
+def train_countries(root, countries=None, years=years, params=None, rounds=default_rounds, seed=42, workers=None,
+                    min_rows=default_min_rows, cache_root=cache_dir, output_dir=models_dir):
+  workers = min(workers or os.cpu_count(), os.cpu_count())
+  params = default_params if params is None else params
+  countries = countries or dataset_countries(root, years)
+
+  start = time.perf_counter()
+  cache = StageCache(cache_root)
+  prepare_partitions(root, years, countries, cache, workers=workers)
+  prepare_seconds = time.perf_counter() - start
+
+  version, version_dir = new_version_dir(output_dir, 'countries')
+  # le modèle EU (le plus long) est soumis en premier
+  jobs = [(eu_code, countries)] + [(country, [country]) for country in countries]
+  with ProcessPoolExecutor(min(workers, len(jobs)), initializer=_init_worker) as executor:
+    futures = [executor.submit(train_country, code, root, job_countries, years, cache_root, params, rounds, seed,
+                               min_rows, version_dir)
+               for code, job_countries in jobs]
+    results = [future.result() for future in futures]
+
+  report = {'version': version, 'dataset': root, 'years': [years[0], years[-1]], 'params': params, 'rounds': rounds,
+            'seed': seed, 'min_rows': min_rows, 'workers': workers, 'prepare_seconds': prepare_seconds, 'stages': cache.stats,
+            'seconds': time.perf_counter() - start, 'models': {result['country']: result for result in results}}
+  with open(os.path.join(version_dir, 'metrics.json'), 'w', encoding='utf-8') as f:
+    json.dump(report, f, indent=2, ensure_ascii=False)
+  return version_dir, report
+
+
+# meilleure configuration XGBoost d'un rapport de machine_learning.train
+def params_from_report(path):
+  with open(path, encoding='utf-8') as f:
+    xgboost_report = json.load(f)['models']['XGBoost']
+  return xgboost_report['best_params'], xgboost_report['rounds']
+
+
+# remplacement des modèles par pays de l'application par ceux d'une version
+def install(version_dir, target_dir=countries_dir):
+  if os.path.exists(target_dir):
+    shutil.rmtree(target_dir)
+  for code in sorted(os.listdir(version_dir)):
+    if os.path.isdir(os.path.join(version_dir, code)):
+      shutil.copytree(os.path.join(version_dir, code), os.path.join(target_dir, code))
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Modèles de prédiction du CO2 par pays et modèle européen commun")
+  parser.add_argument('dataset', help="répertoire du dataset parquet écrit par import.ingest_eea")
+  parser.add_argument('--countries', default=None, help="codes pays séparés par des virgules (tous par défaut)")
+  parser.add_argument('--first-year', type=int, default=years.start)
+  parser.add_argument('--last-year', type=int, default=years.stop - 1)
+  parser.add_argument('--params', default=None, help="metrics.json de machine_learning.train (meilleure configuration XGBoost)")
+  parser.add_argument('--seed', type=int, default=42)
+  parser.add_argument('--min-rows', type=int, default=default_min_rows, help="variantes nécessaires pour un modèle du pays")
+  parser.add_argument('--workers', type=int, default=os.cpu_count())
+  parser.add_argument('--cache-dir', default=cache_dir)
+  parser.add_argument('--output-dir', default=models_dir)
+  parser.add_argument('--install', action='store_true', help="proposer ces modèles dans le calculateur")
+  args = parser.parse_args()
+
+  params, rounds = params_from_report(args.params) if args.params else (default_params, default_rounds)
+  countries = args.countries.split(',') if args.countries else None
+  version_dir, report = train_countries(args.dataset, countries, range(args.first_year, args.last_year + 1), params, rounds,
+                                        args.seed, args.workers, args.min_rows, args.cache_dir, args.output_dir)
+  for code, result in report['models'].items():
+    if result.get('skipped'):
+      print(f"{code} : {result['rows']} lignes, pas de modèle")
+    else:
+      print(f"{code} : R² test {result['test_r2']:.4f}, RMSE test {result['test_rmse']:.3f} ({result['rows']['train']} lignes)")
+  print(f"Modèles et métriques écrits dans {version_dir} en {report['seconds']:.0f} s")
+  if args.install:
+    install(version_dir)
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,111 @@
+# Paramètres d'encodage du calculateur, calculés une fois à l'entrainement et persistés dans un petit fichier :
+# - centre / échelle du RobustScaler ajusté sur col_num
+# - tables de fréquences (value_counts() / len(df)) de chaque colonne catégorielle
+# L'application n'a ainsi plus besoin de relire le dataset nettoyé.
+#
+# Utilisation (depuis la racine du projet) :
+#   python -m machine_learning.encoders streamlit_assets/Dataset_Rendu2_cleaned.csv encoders.joblib
+import argparse
+
+import joblib
+import numpy as np
+from sklearn.preprocessing import RobustScaler
+
+from data_processing.storage import read_dataset
+from machine_learning.features import col_list, col_num, col_cat, n_features
+from machine_learning.instrumentation import span
+
+encoder_path = 'encoders.joblib'
+encoder_version = 1
+
+
+def build_encoder_params(df):
+  scaler = RobustScaler()
+  with span('scaler_fit'):
+    scaler.fit(df[col_num])
+  frequencies = {}
+  with span('value_counts'):
+    for col in col_cat:
+      if col in df.columns:
+        frequencies[col] = (df[col].value_counts() / len(df)).to_dict()
+  return {'version': encoder_version,
+          'col_list': list(col_list),
+          'col_num': list(col_num),
+          'center': scaler.center_,
+          'scale': scaler.scale_,
+          'frequencies': frequencies,
+          'n_rows': len(df)}
+
+
+class FeatureEncoder:
+
+  def __init__(self, params):
+    if params['version'] != encoder_version:
+      raise ValueError(f"version d'encodeur non supportée : {params['version']}")
+    self.params = params
+    self.center = np.asarray(params['center'], dtype='float64')
+    self.scale = np.asarray(params['scale'], dtype='float64')
+    self.frequencies = params['frequencies']
+
+  @classmethod
+  def from_dataframe(cls, df):
+    return cls(build_encoder_params(df))
+
+  @classmethod
+  def load(cls, path=encoder_path):
+    return cls(joblib.load(path))
+
+  def save(self, path=encoder_path):
+    joblib.dump(self.params, path)
+
+  # équivalent de RobustScaler.transform sur les colonnes col_num
+  def transform(self, X):
+    return (np.asarray(X, dtype='float64') - self.center) / self.scale
+
+  def frequency(self, col, value):
+    return self.frequencies[col].get(value, 0)
+
+  # encodage du calculateur : seules la cylindrée, l'année et le carburant sont renseignés,
+  # les autres variables valent 0 ; l'ordre des colonnes est celui de col_list.
+  # La cylindrée est passée telle que saisie (en litres) au scaler, comme dans la page 4 d'origine :
+  # le modèle livré (model_XGBoost.joblib) a été validé avec cet encodage, qui est conservé tel quel
+  def encode(self, fuel_type, engine_capacity, reporting_year):
+    fuel_type = np.atleast_1d(fuel_type)
+    num_mask = np.zeros((len(fuel_type), len(col_num)))
+    num_mask[:, col_num.index('Engine_capacity_cm3')] = engine_capacity
+    num_mask[:, col_num.index('Reporting_year')] = reporting_year
+    encoded_params = self.transform(num_mask)
+
+    fuel_type_freq = self.frequencies['Fuel_type']
+    prediction_input = np.zeros((len(fuel_type), n_features))
+    prediction_input[:, col_list.index('Fuel_type')] = [fuel_type_freq.get(fuel, 0) for fuel in fuel_type]
+    prediction_input[:, col_list.index('Engine_capacity_cm3')] = encoded_params[:, col_num.index('Engine_capacity_cm3')]
+    prediction_input[:, col_list.index('Reporting_year')] = encoded_params[:, col_num.index('Reporting_year')]
+    return prediction_input
+
+  # encodage complet d'un DataFrame du dataset nettoyé (entrainement) : col_num mises à l'échelle,
+  # colonnes catégorielles remplacées par leur fréquence (0 si inconnue), dans l'ordre de col_list
+  def encode_frame(self, df):
+    scaled = self.transform(df[col_num].to_numpy(dtype='float64'))
+    X = np.zeros((len(df), n_features))
+    for i, col in enumerate(col_list[:n_features]):
+      if col in col_num:
+        X[:, i] = scaled[:, col_num.index(col)]
+      else:
+        X[:, i] = df[col].map(self.frequencies[col]).astype('float64').fillna(0).to_numpy()
+    return X
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Calcul des paramètres d'encodage du calculateur à partir du dataset nettoyé")
+  parser.add_argument('dataset', nargs='?', default='streamlit_assets/Dataset_Rendu2_cleaned.csv')
+  parser.add_argument('output', nargs='?', default=encoder_path)
+  args = parser.parse_args()
+
+  encoder = FeatureEncoder.from_dataframe(read_dataset(args.dataset))
+  encoder.save(args.output)
+  print(f"Encodeur écrit dans {args.output} ({encoder.params['n_rows']} lignes, {len(encoder.frequencies)} colonnes encodées)")
+
+
+if __name__ == '__main__':
+  main()
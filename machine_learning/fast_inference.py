@@ -0,0 +1,176 @@
+# Prédiction rapide pour le modèle XGBoost : les arbres du booster sont aplatis dans des tableaux numpy
+# (variable de coupure, seuil, fils gauche / droit) et parcourus niveau par niveau pour tous les arbres à la fois.
+# Les calculs suivent ceux de XGBoost (entrées en float32, x < seuil à gauche, NaN vers la branche par défaut,
+# feuilles additionnées arbre par arbre en float32 à partir de base_score) : les sorties sont identiques à predict.
+#
+# Benchmark de latence par véhicule (depuis la racine du projet) :
+#   python -m machine_learning.fast_inference
+import argparse
+import json
+import time
+
+import numpy as np
+
+from sklearn.preprocessing import RobustScaler
+
+from machine_learning.features import col_list, col_num, fuel_types
+
+
+class FlatTreeEnsemble:
+
+  def __init__(self, split_feature, split_value, left, right, default_left, roots, base_score, max_depth, n_features):
+    self.split_feature = split_feature
+    self.split_value = split_value
+    self.left = left
+    self.right = right
+    self.default_left = default_left
+    self.roots = roots
+    self.base_score = np.float32(base_score)
+    self.max_depth = max_depth
+    # largeur des entrées du booster : les dernières variables peuvent n'apparaître dans aucune coupure
+    self.n_features = int(n_features)
+
+  # seuls les arbres de régression à coupures numériques (reg:squarederror, gbtree) sont pris en charge
+  @classmethod
+  def from_booster(cls, booster):
+    model = json.loads(booster.save_raw(raw_format='json'))['learner']
+    if model['objective']['name'] != 'reg:squarederror' or model['gradient_booster']['name'] != 'gbtree':
+      raise ValueError("modèle non pris en charge : seul gbtree / reg:squarederror est aplati")
+    trees = model['gradient_booster']['model']['trees']
+
+    split_feature, split_value, left, right, default_left, roots, depths = [], [], [], [], [], [], []
+    offset = 0
+    for tree in trees:
+      if any(tree['split_type']):
+        raise ValueError("les coupures catégorielles ne sont pas prises en charge")
+      tree_left = np.asarray(tree['left_children'], dtype='int64')
+      tree_right = np.asarray(tree['right_children'], dtype='int64')
+      is_leaf = tree_left == -1
+      nodes = np.arange(len(tree_left))
+      # une feuille pointe sur elle-même : le parcours peut faire max_depth pas pour tous les arbres
+      left.append(np.where(is_leaf, nodes, tree_left) + offset)
+      right.append(np.where(is_leaf, nodes, tree_right) + offset)
+      split_feature.append(np.where(is_leaf, 0, tree['split_indices']))
+      # pour une feuille, split_conditions contient la valeur de la feuille
+      split_value.append(np.asarray(tree['split_conditions'], dtype='float32'))
+      default_left.append(np.asarray(tree['default_left'], dtype=bool))
+      roots.append(offset)
+      depths.append(_depth(tree_left, tree_right))
+      offset += len(tree_left)
+
+    base_score = float(model['learner_model_param']['base_score'].strip('[]'))
+    return cls(np.concatenate(split_feature), np.concatenate(split_value), np.concatenate(left), np.concatenate(right),
+               np.concatenate(default_left), np.asarray(roots, dtype='int64'), base_score, max(depths),
+               booster.num_features())
+
+  def _leaves(self, X):
+    rows = np.arange(len(X))[:, None]
+    nodes = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+    for _ in range(self.max_depth):
+      values = X[rows, self.split_feature[nodes]]
+      go_left = (values < self.split_value[nodes]) | (np.isnan(values) & self.default_left[nodes])
+      nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+    return nodes
+
+  # base_score puis chaque arbre, additionnés séquentiellement en float32 comme XGBoost (cumsum est séquentiel)
+  def _sum_leaves(self, leaf_nodes):
+    leaf_values = np.empty(leaf_nodes.shape[:-1] + (leaf_nodes.shape[-1] + 1,), dtype='float32')
+    leaf_values[..., 0] = self.base_score
+    leaf_values[..., 1:] = self.split_value[leaf_nodes]
+    return np.cumsum(leaf_values, axis=-1)[..., -1]
+
+  def _check_width(self, X):
+    if X.shape[-1] != self.n_features:
+      raise ValueError(f"{X.shape[-1]} variables en entrée, le modèle en attend {self.n_features}")
+
+  def predict(self, X):
+    X = np.atleast_2d(np.asarray(X, dtype='float32'))
+    if X.ndim != 2:
+      raise ValueError(f"entrées de dimension {X.ndim}, une matrice (lignes, variables) est attendue")
+    self._check_width(X)
+    return self._sum_leaves(self._leaves(X))
+
+  # une seule ligne : parcours sur un vecteur d'un noeud par arbre, sans tableau 2D
+  def predict_one(self, x):
+    x = np.asarray(x, dtype='float32')
+    if x.ndim != 1:
+      raise ValueError(f"entrée de dimension {x.ndim}, une seule ligne est attendue")
+    self._check_width(x)
+    nodes = self.roots
+    for _ in range(self.max_depth):
+      values = x[self.split_feature[nodes]]
+      go_left = (values < self.split_value[nodes]) | (np.isnan(values) & self.default_left[nodes])
+      nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+    return self._sum_leaves(nodes)
+
+
+def _depth(left, right):
+  depth = np.zeros(len(left), dtype='int64')
+  for node in range(len(left)):
+    if left[node] != -1:
+      depth[left[node]] = depth[right[node]] = depth[node] + 1
+  return int(depth.max())
+
+
+def _time_per_call(function, repeat):
+  start = time.perf_counter()
+  for _ in range(repeat):
+    function()
+  return (time.perf_counter() - start) / repeat * 1e6
+
+
+# latence par véhicule : chemin d'origine de la page 4 (listes, reshape, RobustScaler, predict) contre le moteur aplati
+def benchmark(repeat=2000, n_check=20000, seed=0):
+  from machine_learning.registry import get_predictor
+
+  predictor = get_predictor()
+  ensemble = FlatTreeEnsemble.from_booster(predictor.model.get_booster())
+  encoder = predictor.encoder
+  model_xgboost = predictor.model
+  scaler = RobustScaler()
+  scaler.center_, scaler.scale_, scaler.n_features_in_ = encoder.center, encoder.scale, len(col_num)
+  fuel_type_freq = encoder.frequencies['Fuel_type']
+
+  rng = np.random.default_rng(seed)
+  fuel = rng.choice(np.array(fuel_types, dtype=object), n_check)
+  capacity = np.round(rng.uniform(0.5, 10.0, n_check), 1)
+  year = rng.integers(2017, 2023, n_check)
+  X = encoder.encode(fuel, capacity, year)
+  expected = predictor.predict_encoded(X)
+  identical = bool(np.array_equal(expected, ensemble.predict(X))
+                   and all(ensemble.predict_one(X[i]) == expected[i] for i in range(0, n_check, 97)))
+
+  def original_path(fuel_type='DIESEL', engine_capacity=1.6, reporting_year=2022):
+    num_mask = [0] * len(col_num)
+    num_mask[col_num.index('Engine_capacity_cm3')] = engine_capacity
+    num_mask[col_num.index('Reporting_year')] = reporting_year
+    encoded_params = scaler.transform(np.array(num_mask).reshape(1, -1))
+    prediction_input = [0] * (len(col_list) - 1)
+    prediction_input[col_list.index('Fuel_type')] = fuel_type_freq.get(fuel_type, 0)
+    prediction_input[col_list.index('Engine_capacity_cm3')] = encoded_params[0, col_num.index('Engine_capacity_cm3')]
+    prediction_input[col_list.index('Reporting_year')] = encoded_params[0, col_num.index('Reporting_year')]
+    return model_xgboost.predict(np.array(prediction_input).reshape(1, -1))[0]
+
+  def fast_path(fuel_type='DIESEL', engine_capacity=1.6, reporting_year=2022):
+    return ensemble.predict_one(encoder.encode(fuel_type, engine_capacity, reporting_year)[0])
+
+  identical = identical and original_path() == fast_path()
+  x = X[0]
+  return {'identical_outputs': identical,
+          'checked_rows': n_check,
+          'original_path_us': _time_per_call(original_path, repeat),
+          'inplace_predict_us': _time_per_call(lambda: model_xgboost.get_booster().inplace_predict(X[:1]), repeat),
+          'flat_predict_one_us': _time_per_call(lambda: ensemble.predict_one(x), repeat),
+          'flat_path_with_encoding_us': _time_per_call(fast_path, repeat)}
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Benchmark de latence du moteur de prédiction aplati")
+  parser.add_argument('--repeat', type=int, default=2000)
+  args = parser.parse_args()
+  for name, value in benchmark(args.repeat).items():
+    print(f"{name:28s} {value:.1f}" if isinstance(value, float) else f"{name:28s} {value}")
+
+
+if __name__ == '__main__':
+  main()
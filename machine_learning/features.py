@@ -0,0 +1,19 @@
+# Colonnes du dataset nettoyé utilisées par le modèle
+
+# liste des colonnes dans l'ordre d'entrainement du modèle
+col_list = ['Type_approval_number', 'Type', 'Variant', 'Make', 'Commercial_name',
+            'Category_vehicle_type_approved', 'Mass_kg', 'Wheel_Base_(length_mm)',
+            'Track_(width_mm)', 'Fuel_type', 'Fuel_mode', 'Engine_capacity_cm3',
+            'Engine_power_KW', 'Reporting_year', 'CO2_Emissions']
+
+# Séparation des colonnes numériques et catégorielles
+col_num = ['Mass_kg', 'Wheel_Base_(length_mm)', 'Track_(width_mm)', 'Engine_capacity_cm3', 'Engine_power_KW', 'Reporting_year']
+col_cat = ['Type_approval_number', 'Type', 'Variant', 'Make', 'Commercial_name', 'Category_vehicle_type_approved', 'Fuel_mode', 'Fuel_type']
+
+target = 'CO2_Emissions'
+
+# nombre de variables en entrée du modèle
+n_features = len(col_list) - 1
+
+# choix proposés par le calculateur
+fuel_types = ["PETROL", "DIESEL", "LPG", "PETROL/ELECTRIC", "DIESEL/ELECTRIC", 'NG', 'E85', 'NG-BIOMETHANE']
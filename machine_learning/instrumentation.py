@@ -0,0 +1,193 @@
+# Instrumentation légère (bibliothèque standard uniquement, coût de l'ordre de la µs par mesure) :
+# - durées nommées (span) cumulées pour le processus et détaillées pour la réexécution en cours
+# - compteurs (ex. hits / misses des caches Streamlit)
+# - mémoire du processus (RSS courant et maximal)
+# Export en logs structurés (une ligne JSON par réexécution, logger 'co2.instrumentation') et au format texte Prometheus.
+#
+# Variables d'environnement optionnelles :
+#   CO2_METRICS_LOG=data/metrics.jsonl    ajoute une ligne JSON par réexécution à ce fichier
+#   CO2_METRICS_PROM=data/co2_app.prom    réécrit les métriques Prometheus (collecteur textfile de node_exporter)
+import collections
+import contextlib
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+try:
+  import resource
+except ImportError:  # Windows
+  resource = None
+try:
+  import psutil
+except ImportError:
+  psutil = None
+
+logger = logging.getLogger('co2.instrumentation')
+
+_lock = threading.Lock()
+# réexécution en cours : Streamlit exécute le script de chaque session dans son propre thread
+_local = threading.local()
+_timings = {}
+_counters = collections.Counter()
+_runs = collections.deque(maxlen=50)
+
+if os.environ.get('CO2_METRICS_LOG'):
+  _handler = logging.FileHandler(os.environ['CO2_METRICS_LOG'], encoding='utf-8')
+  _handler.setFormatter(logging.Formatter('%(message)s'))
+  logger.addHandler(_handler)
+  logger.setLevel(logging.INFO)
+
+
+# ru_maxrss est en Ko sous Linux, en octets sous macOS
+_maxrss_unit = 1 if sys.platform == 'darwin' else 1024
+
+
+# RSS courant et maximal : /proc et resource (Linux, macOS), sinon psutil s'il est installé (Windows), sinon 0
+def memory_snapshot():
+  info = psutil.Process().memory_info() if psutil is not None else None
+  if resource is not None:
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _maxrss_unit
+  elif info is not None:
+    max_rss = getattr(info, 'peak_wset', info.rss)
+  else:
+    max_rss = 0
+  snapshot = {'max_rss_bytes': max_rss}
+  try:
+    with open('/proc/self/statm') as f:
+      snapshot['rss_bytes'] = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+  except OSError:
+    snapshot['rss_bytes'] = info.rss if info is not None else max_rss
+  return snapshot
+
+
+@contextlib.contextmanager
+def span(name):
+  run = getattr(_local, 'run', None)
+  depth = getattr(_local, 'depth', 0)
+  _local.depth = depth + 1
+  # entrée ajoutée dès l'ouverture : les spans de la réexécution restent dans l'ordre d'exécution
+  entry = {'name': name, 'depth': depth, 'seconds': None}
+  if run is not None:
+    run['spans'].append(entry)
+  start = time.perf_counter()
+  try:
+    yield
+  finally:
+    entry['seconds'] = seconds = time.perf_counter() - start
+    _local.depth = depth
+    with _lock:
+      timing = _timings.setdefault(name, {'count': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+      timing['count'] += 1
+      timing['seconds'] += seconds
+      timing['max_seconds'] = max(timing['max_seconds'], seconds)
+
+
+def count(name, value=1):
+  with _lock:
+    _counters[name] += value
+
+
+# cache Streamlit instrumenté : le corps de la fonction n'est exécuté qu'en cas de miss
+#   @cached('load_co2_data', st.cache_resource(ttl=3600))
+def cached(name, cache_decorator):
+  def decorator(function):
+    @functools.wraps(function)
+    def compute(*args, **kwargs):
+      count(f'{name}_misses')
+      return function(*args, **kwargs)
+
+    cached_function = cache_decorator(compute)
+
+    @functools.wraps(function)
+    def call(*args, **kwargs):
+      count(f'{name}_calls')
+      with span(name):
+        return cached_function(*args, **kwargs)
+
+    call.clear = cached_function.clear
+    return call
+  return decorator
+
+
+def cache_stats():
+  with _lock:
+    names = sorted({key[:-len('_calls')] for key in _counters if key.endswith('_calls')})
+    return {name: {'calls': _counters[f'{name}_calls'], 'misses': _counters[f'{name}_misses'],
+                   'hits': _counters[f'{name}_calls'] - _counters[f'{name}_misses']} for name in names}
+
+
+# début d'une réexécution ; `fields` (ex. page=...) sont ajoutés à la ligne de log
+def start_run(**fields):
+  _local.run = dict(fields, started=time.time(), spans=[], memory_before=memory_snapshot())
+  _local.depth = 0
+  _local.start = time.perf_counter()
+
+
+# fin de la réexécution : mémoire, ligne de log JSON, fichier Prometheus éventuel
+def finish_run(**fields):
+  run = getattr(_local, 'run', None)
+  if run is None:
+    return None
+  _local.run = None
+  run.update(fields)
+  run['seconds'] = time.perf_counter() - _local.start
+  run['memory_after'] = memory_snapshot()
+  run['caches'] = cache_stats()
+  with _lock:
+    _runs.append(run)
+  count('runs')
+  logger.info(json.dumps(run))
+  if os.environ.get('CO2_METRICS_PROM'):
+    write_prometheus(os.environ['CO2_METRICS_PROM'])
+  return run
+
+
+def last_runs():
+  with _lock:
+    return list(_runs)
+
+
+def snapshot():
+  with _lock:
+    return {'timings': {name: dict(timing) for name, timing in _timings.items()}, 'counters': dict(_counters),
+            'memory': memory_snapshot()}
+
+
+def _label(value):
+  return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus_text(prefix='co2_app'):
+  state = snapshot()
+  lines = [f'# TYPE {prefix}_span_seconds_total counter',
+           f'# TYPE {prefix}_span_calls_total counter',
+           f'# TYPE {prefix}_span_max_seconds gauge']
+  for name, timing in sorted(state['timings'].items()):
+    label = f'{{span="{_label(name)}"}}'
+    lines.append(f"{prefix}_span_seconds_total{label} {timing['seconds']:.6f}")
+    lines.append(f"{prefix}_span_calls_total{label} {timing['count']}")
+    lines.append(f"{prefix}_span_max_seconds{label} {timing['max_seconds']:.6f}")
+  lines.append(f'# TYPE {prefix}_events_total counter')
+  for name, value in sorted(state['counters'].items()):
+    lines.append(f'{prefix}_events_total{{name="{_label(name)}"}} {value}')
+  lines.append(f'# TYPE {prefix}_memory_bytes gauge')
+  for name, value in sorted(state['memory'].items()):
+    lines.append(f'{prefix}_memory_bytes{{kind="{name[:-len("_bytes")]}"}} {value}')
+  return '\n'.join(lines) + '\n'
+
+
+def write_prometheus(path, prefix='co2_app'):
+  with open(path + '.tmp', 'w', encoding='utf-8') as f:
+    f.write(prometheus_text(prefix))
+  os.replace(path + '.tmp', path)
+
+
+def reset():
+  with _lock:
+    _timings.clear()
+    _counters.clear()
+    _runs.clear()
@@ -0,0 +1,108 @@
+# Surface de prédiction précalculée pour le calculateur : les 3 entrées du modèle ne prennent que
+# 8 carburants x 96 cylindrées (0.5 à 10.0 L, pas de 0.1) x 6 années, soit 4 608 combinaisons.
+# Toute la grille est prédite en un seul appel à predict, puis chaque clic devient une lecture de tableau.
+#
+# Utilisation (depuis la racine du projet) :
+#   python -m machine_learning.lookup prediction_surface.npz
+import argparse
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from machine_learning.features import fuel_types
+from machine_learning.instrumentation import span
+from machine_learning.registry import get_artifact, get_predictor
+
+surface_path = 'prediction_surface.npz'
+
+# grille des entrées du calculateur (mêmes bornes et pas que les sliders de la page 4)
+capacity_min, capacity_max, capacity_step = 0.5, 10.0, 0.1
+capacities = np.round(np.arange(capacity_min, capacity_max + capacity_step / 2, capacity_step), 1)
+years = np.arange(2017, 2023)
+
+# surfaces calculées gardées en mémoire (une par couple modèle / encodeur, ex. un par pays)
+max_built = 32
+
+_lock = threading.Lock()
+_built = {}
+
+
+class PredictionSurface:
+
+  def __init__(self, values, fuel_types, capacities, years, model_sha256, encoder_sha256):
+    self.values = values
+    self.fuel_types = list(fuel_types)
+    self.capacities = capacities
+    self.years = years
+    self.model_sha256 = str(model_sha256)
+    self.encoder_sha256 = str(encoder_sha256)
+    self._fuel_index = {fuel: i for i, fuel in enumerate(self.fuel_types)}
+
+  # toute la grille en un seul predict ; values[fuel, cylindrée, année]
+  @classmethod
+  def build(cls, predictor, fuel_types=fuel_types, capacities=capacities, years=years):
+    fuel_grid, capacity_grid, year_grid = np.meshgrid(np.asarray(fuel_types, dtype=object), capacities, years, indexing='ij')
+    predictions = predictor.predict(fuel_grid.ravel(), capacity_grid.ravel(), year_grid.ravel())
+    values = np.asarray(predictions, dtype='float32').reshape(fuel_grid.shape)
+    return cls(values, fuel_types, capacities, years, predictor.model_sha256, predictor.encoder_sha256)
+
+  @classmethod
+  def load(cls, path=surface_path):
+    with np.load(path) as data:
+      return cls(data['values'], data['fuel_types'], data['capacities'], data['years'],
+                 data['model_sha256'], data['encoder_sha256'])
+
+  def save(self, path=surface_path):
+    with open(path, 'wb') as f:
+      np.savez_compressed(f, values=self.values, fuel_types=np.array(self.fuel_types), capacities=self.capacities,
+                          years=self.years, model_sha256=self.model_sha256, encoder_sha256=self.encoder_sha256)
+
+  # la surface n'est valable que pour le modèle et l'encodeur qui l'ont produite
+  def matches(self, predictor):
+    return (self.model_sha256, self.encoder_sha256) == (predictor.model_sha256, predictor.encoder_sha256)
+
+  # émissions (g/km) pour une combinaison du calculateur ; la cylindrée est ramenée au pas de la grille
+  def lookup(self, fuel_type, engine_capacity, reporting_year):
+    i = self._fuel_index[fuel_type]
+    j = int(round((engine_capacity - self.capacities[0]) / capacity_step))
+    k = int(reporting_year - self.years[0])
+    if not (0 <= j < len(self.capacities) and 0 <= k < len(self.years)):
+      raise KeyError((fuel_type, engine_capacity, reporting_year))
+    return self.values[i, j, k]
+
+  # courbes émissions / cylindrée par carburant pour une année donnée
+  def curves(self, reporting_year):
+    k = int(reporting_year - self.years[0])
+    return pd.DataFrame(self.values[:, :, k].T, index=pd.Index(self.capacities, name='Cylindrée (L)'), columns=self.fuel_types)
+
+
+# surface du fichier précalculé si elle correspond au prédicteur, sinon calculée une fois par processus
+def get_surface(predictor, path=surface_path):
+  if os.path.exists(path):
+    surface = get_artifact(path, PredictionSurface.load).value
+    if surface.matches(predictor):
+      return surface
+  key = (predictor.model_sha256, predictor.encoder_sha256)
+  with _lock:
+    if key not in _built:
+      if len(_built) >= max_built:
+        _built.pop(next(iter(_built)))
+      with span('prediction_surface'):
+        _built[key] = PredictionSurface.build(predictor)
+    return _built[key]
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Précalcul de la surface de prédiction du calculateur")
+  parser.add_argument('output', nargs='?', default=surface_path)
+  args = parser.parse_args()
+
+  surface = PredictionSurface.build(get_predictor())
+  surface.save(args.output)
+  print(f"Surface {surface.values.shape} écrite dans {args.output}")
+
+
+if __name__ == '__main__':
+  main()
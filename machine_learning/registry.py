@@ -0,0 +1,135 @@
+# Registre des artefacts (modèle, encodeur, ...) partagé par tout le processus :
+# chaque fichier est chargé une seule fois pour toutes les sessions, puis rechargé à chaud si son contenu change.
+import hashlib
+import os
+import threading
+from dataclasses import dataclass
+
+import joblib
+import numpy as np
+
+from machine_learning.encoders import FeatureEncoder, encoder_path
+from machine_learning.fast_inference import FlatTreeEnsemble
+from machine_learning.instrumentation import span
+
+model_path = 'model_XGBoost.joblib'
+# modèles par pays installés par machine_learning.countries : models/countries/<code>/
+countries_dir = os.path.join('models', 'countries')
+
+_lock = threading.RLock()
+_artifacts = {}
+_predictors = {}
+
+
+@dataclass
+class Artifact:
+  path: str
+  sha256: str
+  stat: tuple
+  value: object
+
+
+def file_sha256(path):
+  digest = hashlib.sha256()
+  with open(path, 'rb') as f:
+    for block in iter(lambda: f.read(1 << 20), b''):
+      digest.update(block)
+  return digest.hexdigest()
+
+
+def _stat(path):
+  stat = os.stat(path)
+  return (stat.st_mtime_ns, stat.st_size)
+
+
+# renvoie l'artefact en cache ; le fichier n'est re-haché que si sa date ou sa taille a changé,
+# et rechargé que si son contenu (sha256) a réellement changé
+def get_artifact(path, loader=joblib.load):
+  path = os.path.abspath(path)
+  stat = _stat(path)
+  key = (path, loader)
+  with _lock:
+    artifact = _artifacts.get(key)
+    if artifact is not None and artifact.stat == stat:
+      return artifact
+    with span('sha256'):
+      sha256 = file_sha256(path)
+    if artifact is not None and artifact.sha256 == sha256:
+      artifact.stat = stat
+      return artifact
+    with span(f'load {os.path.basename(path)}'):
+      value = loader(path)
+    artifact = Artifact(path, sha256, stat, value)
+    _artifacts[key] = artifact
+    return artifact
+
+
+# {code pays: (modèle, encodeur)} des modèles par pays installés
+def country_models(root=countries_dir):
+  models = {}
+  if os.path.isdir(root):
+    for code in sorted(os.listdir(root)):
+      paths = (os.path.join(root, code, model_path), os.path.join(root, code, encoder_path))
+      if all(os.path.exists(path) for path in paths):
+        models[code] = paths
+  return models
+
+
+def loaded_artifacts():
+  with _lock:
+    return [{'path': artifact.path, 'sha256': artifact.sha256} for artifact in _artifacts.values()]
+
+
+def clear():
+  with _lock:
+    _artifacts.clear()
+    _predictors.clear()
+
+
+# modèle + encodeur (RobustScaler et fréquences) prêts pour la prédiction ;
+# ensemble : arbres aplatis (fast_inference) utilisés pour les prédictions d'une seule ligne
+@dataclass(frozen=True)
+class CO2Predictor:
+  model: object
+  encoder: FeatureEncoder
+  model_sha256: str
+  encoder_sha256: str
+  ensemble: FlatTreeEnsemble = None
+
+  # prédiction sur des entrées déjà encodées (ordre de col_list)
+  def predict_encoded(self, prediction_input):
+    with span('predict'):
+      if self.ensemble is not None and len(prediction_input) == 1:
+        return np.array([self.ensemble.predict_one(prediction_input[0])])
+      return self.model.predict(prediction_input)
+
+  # émissions (g/km) pour les entrées du calculateur, une valeur ou des tableaux
+  def predict(self, fuel_type, engine_capacity, reporting_year):
+    return self.predict_encoded(self.encoder.encode(fuel_type, engine_capacity, reporting_year))
+
+
+def _flatten(model):
+  try:
+    return FlatTreeEnsemble.from_booster(model.get_booster())
+  except (AttributeError, ValueError):
+    return None
+
+
+# encoder_fallback : fonction appelée pour construire l'encodeur quand encoders.joblib n'existe pas
+def get_predictor(model_path=model_path, encoder_path=encoder_path, encoder_fallback=None):
+  model = get_artifact(model_path)
+  if encoder_fallback is not None and not os.path.exists(encoder_path):
+    encoder = encoder_fallback()
+    encoder_sha256 = f'fallback-{id(encoder)}'
+  else:
+    artifact = get_artifact(encoder_path, FeatureEncoder.load)
+    encoder, encoder_sha256 = artifact.value, artifact.sha256
+
+  # un seul prédicteur par couple de fichiers : il est remplacé quand l'un des deux artefacts change
+  key = (model.path, os.path.abspath(encoder_path))
+  with _lock:
+    predictor = _predictors.get(key)
+    if predictor is None or (predictor.model_sha256, predictor.encoder_sha256) != (model.sha256, encoder_sha256):
+      predictor = CO2Predictor(model.value, encoder, model.sha256, encoder_sha256, _flatten(model.value))
+      _predictors[key] = predictor
+    return predictor
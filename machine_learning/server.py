@@ -0,0 +1,206 @@
+# Service HTTP de prédiction des émissions de CO2 (API JSON), sans interface Streamlit.
+# Les requêtes simultanées sont regroupées en micro-lots (au plus max_batch_rows lignes ou max_delay_ms
+# millisecondes d'attente) avant l'appel à predict, dont le coût fixe est ainsi partagé.
+#
+# Utilisation (depuis la racine du projet) :
+#   python -m machine_learning.server --port 8000
+#
+#   POST /predict       {"fuel_type": "DIESEL", "engine_capacity": 1.6, "reporting_year": 2022, "yearly_km": 10400}
+#   POST /predict/bulk  {"vehicles": [{...}, {...}]}
+#   GET  /health
+#   GET  /metrics
+import argparse
+import asyncio
+import contextlib
+import functools
+import json
+import time
+
+import numpy as np
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from machine_learning.batch_predict import default_yearly_km
+from machine_learning.encoders import encoder_path
+from machine_learning.registry import get_predictor, model_path
+
+
+class MicroBatcher:
+
+  # load_predictor : fonction renvoyant le prédicteur courant (rechargé par le registre si les fichiers changent)
+  def __init__(self, load_predictor, max_batch_rows=1024, max_delay_ms=2.0):
+    self.load_predictor = load_predictor
+    self.max_batch_rows = max_batch_rows
+    self.max_delay = max_delay_ms / 1000
+    self.metrics = {'requests': 0, 'rows': 0, 'batches': 0, 'failed_batches': 0, 'predict_seconds': 0.0}
+    self._queue = None
+    self._task = None
+
+  async def start(self):
+    self._queue = asyncio.Queue()
+    self._task = asyncio.create_task(self._run())
+
+  async def stop(self):
+    self._task.cancel()
+
+  # émissions (g/km) pour des tableaux d'entrées du calculateur (trois tableaux 1D de même longueur)
+  async def predict(self, fuel_type, engine_capacity, reporting_year):
+    arrays = [np.asarray(fuel_type, dtype=object), np.asarray(engine_capacity), np.asarray(reporting_year)]
+    if any(array.ndim != 1 for array in arrays) or len({len(array) for array in arrays}) != 1:
+      raise ValueError("les entrées doivent être trois tableaux 1D de même longueur")
+    fuel_type, engine_capacity, reporting_year = arrays
+    future = asyncio.get_running_loop().create_future()
+    await self._queue.put((fuel_type, engine_capacity, reporting_year, future))
+    self.metrics['requests'] += 1
+    return await future
+
+  async def _next_batch(self):
+    items = [await self._queue.get()]
+    rows = len(items[0][0])
+    deadline = time.perf_counter() + self.max_delay
+    while rows < self.max_batch_rows:
+      timeout = deadline - time.perf_counter()
+      if timeout <= 0:
+        break
+      try:
+        item = await asyncio.wait_for(self._queue.get(), timeout)
+      except asyncio.TimeoutError:
+        break
+      items.append(item)
+      rows += len(item[0])
+    return items
+
+  async def _predict_batch(self, items):
+    fuel_type = np.concatenate([item[0] for item in items])
+    engine_capacity = np.concatenate([item[1] for item in items])
+    reporting_year = np.concatenate([item[2] for item in items])
+    start = time.perf_counter()
+    # predict libère le GIL : la boucle continue d'accepter des requêtes pendant le calcul
+    predictor = self.load_predictor()
+    predictions = await asyncio.get_running_loop().run_in_executor(None, predictor.predict, fuel_type, engine_capacity,
+                                                                   reporting_year)
+    if len(predictions) != len(fuel_type):
+      raise ValueError(f"{len(predictions)} prédictions pour {len(fuel_type)} véhicules")
+    self.metrics['predict_seconds'] += time.perf_counter() - start
+    self.metrics['batches'] += 1
+    self.metrics['rows'] += len(predictions)
+
+    offset = 0
+    for item in items:
+      size = len(item[0])
+      if not item[3].done():
+        item[3].set_result(predictions[offset:offset + size])
+      offset += size
+
+  # la tâche ne s'arrête jamais sur une erreur : seules les requêtes du lot en échec la reçoivent
+  async def _run(self):
+    while True:
+      items = await self._next_batch()
+      try:
+        await self._predict_batch(items)
+      except Exception as error:
+        self.metrics['failed_batches'] += 1
+        for item in items:
+          if not item[3].done():
+            item[3].set_exception(error)
+
+
+# vérification des entrées d'un véhicule ; ValueError -> réponse 400
+def parse_vehicle(vehicle):
+  try:
+    fuel_type = str(vehicle['fuel_type'])
+    engine_capacity = float(vehicle['engine_capacity'])
+    reporting_year = int(vehicle['reporting_year'])
+    yearly_km = float(vehicle.get('yearly_km', default_yearly_km))
+  except (AttributeError, KeyError, TypeError, ValueError) as error:
+    raise ValueError(f"véhicule invalide : {vehicle!r} ({error})")
+  return fuel_type, engine_capacity, reporting_year, yearly_km
+
+
+def _responses(vehicles, predictions):
+  return [{'co2_g_km': float(co2), 'yearly_tonnes_co2': float(co2) * vehicle[3] / 1000000}
+          for vehicle, co2 in zip(vehicles, predictions)]
+
+
+def create_app(model_path=model_path, encoder_path=encoder_path, max_batch_rows=1024, max_delay_ms=2.0):
+  load_predictor = functools.partial(get_predictor, model_path, encoder_path)
+  # chargement au démarrage : un fichier manquant est signalé tout de suite
+  load_predictor()
+  batcher = MicroBatcher(load_predictor, max_batch_rows, max_delay_ms)
+  started = time.time()
+
+  async def predict_vehicles(vehicles):
+    parsed = [parse_vehicle(vehicle) for vehicle in vehicles]
+    if not parsed:
+      return []
+    predictions = await batcher.predict(np.array([v[0] for v in parsed], dtype=object),
+                                        np.array([v[1] for v in parsed]),
+                                        np.array([v[2] for v in parsed]))
+    return _responses(parsed, predictions)
+
+  async def read_json(request):
+    try:
+      return await request.json()
+    except json.JSONDecodeError as error:
+      raise ValueError(f"JSON invalide ({error})")
+
+  async def predict(request):
+    try:
+      results = await predict_vehicles([await read_json(request)])
+    except ValueError as error:
+      return JSONResponse({'error': str(error)}, status_code=400)
+    return JSONResponse(results[0])
+
+  async def predict_bulk(request):
+    try:
+      body = await read_json(request)
+      vehicles = body.get('vehicles', []) if isinstance(body, dict) else None
+      if not isinstance(vehicles, list):
+        raise ValueError("le champ 'vehicles' doit être une liste")
+      results = await predict_vehicles(vehicles)
+    except ValueError as error:
+      return JSONResponse({'error': str(error)}, status_code=400)
+    return JSONResponse({'predictions': results})
+
+  async def health(request):
+    predictor = load_predictor()
+    return JSONResponse({'status': 'ok', 'model_sha256': predictor.model_sha256, 'encoder_sha256': predictor.encoder_sha256})
+
+  async def metrics(request):
+    metrics = dict(batcher.metrics)
+    metrics['uptime_seconds'] = time.time() - started
+    metrics['mean_batch_rows'] = metrics['rows'] / metrics['batches'] if metrics['batches'] else 0.0
+    return JSONResponse(metrics)
+
+  routes = [Route('/predict', predict, methods=['POST']),
+            Route('/predict/bulk', predict_bulk, methods=['POST']),
+            Route('/health', health),
+            Route('/metrics', metrics)]
+
+  @contextlib.asynccontextmanager
+  async def lifespan(app):
+    await batcher.start()
+    yield
+    await batcher.stop()
+
+  return Starlette(routes=routes, lifespan=lifespan)
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Service HTTP de prédiction des émissions de CO2")
+  parser.add_argument('--host', default='0.0.0.0')
+  parser.add_argument('--port', type=int, default=8000)
+  parser.add_argument('--max-batch-rows', type=int, default=1024)
+  parser.add_argument('--max-delay-ms', type=float, default=2.0)
+  parser.add_argument('--model', default=model_path)
+  parser.add_argument('--encoder', default=encoder_path)
+  args = parser.parse_args()
+
+  app = create_app(args.model, args.encoder, args.max_batch_rows, args.max_delay_ms)
+  uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+  main()
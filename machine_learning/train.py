@@ -0,0 +1,234 @@
+# Entrainement reproductible des 3 familles de modèles de la page 3 (Gradient Boosting, XGBoost, Random Forest)
+# avec des arbres à histogrammes, et recherche d'hyperparamètres en parallèle sur tous les coeurs :
+# - tirage aléatoire (graine fixe) des configurations de chaque famille
+# - élimination successive (successive halving) : chaque tour entraîne les configurations restantes sur une
+#   part croissante des données et ne garde que le meilleur tiers, les mauvais essais sont abandonnés tôt
+# - arrêt précoce (early stopping) sur un jeu de validation
+# Les modèles, l'encodeur et un rapport de métriques sont écrits dans models/<version>/.
+#
+# Utilisation (depuis la racine du projet) :
+#   python -m machine_learning.train streamlit_assets/Dataset_Rendu2_cleaned.csv --trials 27 --install
+import argparse
+import json
+import math
+import os
+import secrets
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import sklearn
+import xgboost
+from sklearn.ensemble import HistGradientBoostingRegressor
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+from threadpoolctl import threadpool_limits
+from xgboost import XGBRegressor, XGBRFRegressor
+
+from data_processing.storage import read_dataset, remove_unused_categories
+from machine_learning.encoders import FeatureEncoder
+from machine_learning.features import target
+from machine_learning.registry import file_sha256
+
+models_dir = 'models'
+
+# espaces de recherche : (type, bornes) ; 'log' = tirage uniforme sur l'échelle logarithmique
+search_spaces = {
+  'GradientBoosting': {'learning_rate': ('log', 0.02, 0.3), 'max_leaf_nodes': ('int', 15, 255),
+                       'min_samples_leaf': ('int', 5, 200), 'l2_regularization': ('float', 0.0, 1.0)},
+  'XGBoost': {'learning_rate': ('log', 0.02, 0.3), 'max_depth': ('int', 4, 12), 'min_child_weight': ('log', 1, 20),
+              'subsample': ('float', 0.6, 1.0), 'colsample_bytree': ('float', 0.6, 1.0), 'reg_lambda': ('log', 0.1, 10)},
+  'RandomForest': {'n_estimators': ('int', 100, 400), 'max_depth': ('int', 8, 20), 'min_child_weight': ('log', 1, 20),
+                   'subsample': ('float', 0.5, 0.9), 'colsample_bynode': ('float', 0.4, 1.0)},
+}
+
+# nombre maximal d'itérations de boosting (l'arrêt précoce décide du nombre réel)
+max_rounds = 2000
+early_stopping_rounds = 50
+
+_data = None
+
+
+def sample_params(space, rng):
+  params = {}
+  for name, (kind, low, high) in space.items():
+    if kind == 'int':
+      params[name] = int(rng.integers(low, high + 1))
+    elif kind == 'log':
+      params[name] = float(math.exp(rng.uniform(math.log(low), math.log(high))))
+    else:
+      params[name] = float(rng.uniform(low, high))
+  return params
+
+
+# tous les modèles utilisent des arbres construits sur histogrammes ;
+# la forêt aléatoire est celle de XGBoost (XGBRFRegressor, tree_method='hist')
+def make_model(family, params, seed, n_jobs=1, n_rounds=None):
+  if family == 'GradientBoosting':
+    if n_rounds is None:
+      return HistGradientBoostingRegressor(max_iter=max_rounds, early_stopping=True, validation_fraction=0.1,
+                                           n_iter_no_change=early_stopping_rounds, random_state=seed, **params)
+    return HistGradientBoostingRegressor(max_iter=n_rounds, early_stopping=False, random_state=seed, **params)
+  if family == 'XGBoost':
+    if n_rounds is None:
+      return XGBRegressor(tree_method='hist', n_estimators=max_rounds, early_stopping_rounds=early_stopping_rounds,
+                          random_state=seed, n_jobs=n_jobs, **params)
+    return XGBRegressor(tree_method='hist', n_estimators=n_rounds, random_state=seed, n_jobs=n_jobs, **params)
+  if family == 'RandomForest':
+    return XGBRFRegressor(tree_method='hist', random_state=seed, n_jobs=n_jobs, **params)
+  raise ValueError(f"famille de modèles inconnue : {family}")
+
+
+def fit_model(model, X_train, y_train, X_val, y_val):
+  if isinstance(model, XGBRegressor) and model.get_params()['early_stopping_rounds']:
+    model.fit(X_train, y_train, eval_set=[(X_val, y_val)], verbose=False)
+  else:
+    model.fit(X_train, y_train)
+  return model
+
+
+# nombre d'itérations retenu par l'arrêt précoce
+def fitted_rounds(model):
+  if isinstance(model, HistGradientBoostingRegressor):
+    return int(model.n_iter_)
+  if isinstance(model, XGBRegressor) and model.get_params()['early_stopping_rounds']:
+    return int(model.best_iteration) + 1
+  return None
+
+
+# les données sont envoyées une seule fois à chaque processus ; un seul thread par processus
+def _init_worker(data):
+  global _data
+  _data = data
+  threadpool_limits(1)
+
+
+def _run_trial(family, params, fraction, seed):
+  X_train, y_train, X_val, y_val = _data
+  n_rows = max(int(len(X_train) * fraction), 1)
+  start = time.perf_counter()
+  model = fit_model(make_model(family, params, seed), X_train[:n_rows], y_train[:n_rows], X_val, y_val)
+  rmse = float(np.sqrt(mean_squared_error(y_val, model.predict(X_val))))
+  return {'family': family, 'params': params, 'fraction': fraction, 'val_rmse': rmse,
+          'rounds': fitted_rounds(model), 'seconds': time.perf_counter() - start}
+
+
+# élimination successive : tours sur 1/eta², 1/eta puis 100 % des données d'entrainement
+def successive_halving(executor, family, n_trials, seed, eta=3, n_rungs=3):
+  rng = np.random.default_rng(seed)
+  candidates = [sample_params(search_spaces[family], rng) for _ in range(n_trials)]
+  trials = []
+  for rung in range(n_rungs):
+    fraction = eta ** (rung - n_rungs + 1)
+    futures = [executor.submit(_run_trial, family, params, fraction, seed) for params in candidates]
+    results = sorted((future.result() for future in futures), key=lambda result: result['val_rmse'])
+    for result in results:
+      result['rung'] = rung
+    trials.extend(results)
+    keep = max(1, math.ceil(len(results) / eta)) if rung < n_rungs - 1 else 1
+    candidates = [result['params'] for result in results[:keep]]
+  best = min((trial for trial in trials if trial['rung'] == n_rungs - 1), key=lambda trial: trial['val_rmse'])
+  return best, trials
+
+
+def scores(model, X_train, y_train, X_test, y_test):
+  pred_test = model.predict(X_test)
+  mse = float(mean_squared_error(y_test, pred_test))
+  return {'train_r2': float(r2_score(y_train, model.predict(X_train))),
+          'test_r2': float(r2_score(y_test, pred_test)),
+          'test_mse': mse,
+          'test_rmse': math.sqrt(mse)}
+
+
+# répertoire d'une nouvelle version : horodatage, étiquette et suffixe aléatoire (deux entrainements lancés
+# dans la même seconde sur les mêmes données ne partagent pas le même répertoire)
+def new_version_dir(output_dir, label):
+  version = f"{time.strftime('%Y%m%d-%H%M%S')}-{label}-{secrets.token_hex(3)}"
+  version_dir = os.path.join(output_dir, version)
+  os.makedirs(version_dir)
+  return version, version_dir
+
+
+# progress : fonction appelée après chaque famille avec (famille, métriques du modèle retenu)
+def train(dataset_path, families=tuple(search_spaces), n_trials=27, seed=42, workers=None, output_dir=models_dir,
+          progress=None):
+  workers = workers or os.cpu_count()
+  df = read_dataset(dataset_path).dropna(subset=[target])
+  train_df, test_df = train_test_split(df, test_size=0.2, random_state=seed)
+  train_df = remove_unused_categories(train_df)
+  search_df, val_df = train_test_split(train_df, test_size=0.2, random_state=seed)
+
+  # l'encodeur (RobustScaler + fréquences) n'est ajusté que sur les données d'entrainement
+  encoder = FeatureEncoder.from_dataframe(train_df)
+  X_search, y_search = encoder.encode_frame(search_df), search_df[target].to_numpy()
+  X_val, y_val = encoder.encode_frame(val_df), val_df[target].to_numpy()
+  X_train, y_train = encoder.encode_frame(train_df), train_df[target].to_numpy()
+  X_test, y_test = encoder.encode_frame(test_df), test_df[target].to_numpy()
+
+  data_sha256 = file_sha256(dataset_path)
+  version, version_dir = new_version_dir(output_dir, data_sha256[:8])
+
+  report = {'version': version, 'dataset': dataset_path, 'dataset_sha256': data_sha256, 'seed': seed,
+            'n_trials': n_trials, 'workers': workers, 'rows': {'train': len(train_df), 'test': len(test_df)},
+            'libraries': {'scikit-learn': sklearn.__version__, 'xgboost': xgboost.__version__}, 'models': {}}
+
+  with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=((X_search, y_search, X_val, y_val),)) as executor:
+    for family in families:
+      start = time.perf_counter()
+      best, trials = successive_halving(executor, family, n_trials, seed)
+      search_seconds = time.perf_counter() - start
+
+      # modèle final : meilleure configuration réentrainée sur tout le jeu d'entrainement,
+      # avec le nombre d'itérations trouvé par l'arrêt précoce
+      start = time.perf_counter()
+      model = make_model(family, best['params'], seed, n_jobs=workers, n_rounds=best['rounds'])
+      model.fit(X_train, y_train)
+      fit_seconds = time.perf_counter() - start
+
+      model_file = os.path.join(version_dir, f'model_{family}.joblib')
+      joblib.dump(model, model_file)
+      report['models'][family] = {'file': model_file, 'best_params': best['params'], 'rounds': best['rounds'],
+                                  'val_rmse': best['val_rmse'], 'search_seconds': search_seconds,
+                                  'fit_seconds': fit_seconds, 'trials': trials,
+                                  **scores(model, X_train, y_train, X_test, y_test)}
+      if progress is not None:
+        progress(family, report['models'][family])
+
+  encoder.save(os.path.join(version_dir, 'encoders.joblib'))
+  with open(os.path.join(version_dir, 'metrics.json'), 'w', encoding='utf-8') as f:
+    json.dump(report, f, indent=2, ensure_ascii=False)
+  return version_dir, report
+
+
+# copie du modèle XGBoost et de l'encodeur d'une version à la racine, où l'application les charge
+def install(version_dir):
+  shutil.copyfile(os.path.join(version_dir, 'model_XGBoost.joblib'), 'model_XGBoost.joblib')
+  shutil.copyfile(os.path.join(version_dir, 'encoders.joblib'), 'encoders.joblib')
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Entrainement et recherche d'hyperparamètres des modèles de prédiction du CO2")
+  parser.add_argument('dataset', nargs='?', default='streamlit_assets/Dataset_Rendu2_cleaned.csv')
+  parser.add_argument('--families', nargs='+', default=list(search_spaces), choices=list(search_spaces))
+  parser.add_argument('--trials', type=int, default=27, help="configurations tirées par famille")
+  parser.add_argument('--seed', type=int, default=42)
+  parser.add_argument('--workers', type=int, default=os.cpu_count())
+  parser.add_argument('--output-dir', default=models_dir)
+  parser.add_argument('--install', action='store_true', help="utiliser le nouveau modèle XGBoost dans l'application")
+  args = parser.parse_args()
+
+  version_dir, report = train(args.dataset, args.families, args.trials, args.seed, args.workers, args.output_dir,
+                              progress=lambda family, result: print(
+                                f"{family} : R² test {result['test_r2']:.4f}, RMSE test {result['test_rmse']:.3f} "
+                                f"(recherche {result['search_seconds']:.0f} s)"))
+  print(f"Modèles et métriques écrits dans {version_dir}")
+  if args.install:
+    if 'XGBoost' not in report['models']:
+      parser.error("--install nécessite la famille XGBoost")
+    install(version_dir)
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,122 @@
+# Suite de benchmarks : chaque test mesure une étape avec la fixture `bench` ; en fin de session les temps sont
+# écrits en JSON et comparés à une référence, tout ralentissement au-delà du seuil fait échouer la session.
+#
+#   python -m pytest tests                                   # tailles 10k, comparaison si la référence existe
+#   python -m pytest tests --bench-sizes 10k,1m,10m
+#   python -m pytest tests --bench-save-baseline             # enregistre la référence
+import json
+import os
+import platform
+import time
+
+import pytest
+
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_recorder_key = pytest.StashKey()
+
+
+def pytest_addoption(parser):
+  group = parser.getgroup('benchmarks')
+  group.addoption('--bench-sizes', default='10k', help="tailles des jeux synthétiques : 10k, 1m, 10m (séparées par des virgules)")
+  group.addoption('--bench-output', default=os.path.join(root_dir, '.benchmarks', 'latest.json'))
+  group.addoption('--bench-baseline', default=os.path.join(root_dir, '.benchmarks', 'baseline.json'))
+  group.addoption('--bench-threshold', type=float, default=0.3, help="ralentissement toléré par rapport à la référence (0.3 = +30 %%)")
+  group.addoption('--bench-min-delta', type=float, default=0.005,
+                  help="écart minimal en secondes pour signaler une régression (les mesures de moins d'une milliseconde sont bruitées)")
+  group.addoption('--bench-save-baseline', action='store_true')
+
+
+class BenchmarkRecorder:
+
+  def __init__(self):
+    self.results = {}
+
+  # meilleur temps sur `repeat` exécutions ; renvoie le résultat de la dernière
+  def measure(self, name, function, rows=None, repeat=3):
+    timings = []
+    for _ in range(repeat):
+      start = time.perf_counter()
+      result = function()
+      timings.append(time.perf_counter() - start)
+    entry = {'seconds': min(timings), 'repeat': repeat}
+    if rows:
+      entry['rows'] = rows
+      entry['rows_per_second'] = rows / entry['seconds']
+    self.results[name] = entry
+    return result
+
+
+def pytest_configure(config):
+  config.stash[_recorder_key] = BenchmarkRecorder()
+
+
+def pytest_generate_tests(metafunc):
+  if 'size' in metafunc.fixturenames:
+    metafunc.parametrize('size', metafunc.config.getoption('--bench-sizes').split(','), scope='module')
+
+
+@pytest.fixture(scope='session')
+def bench(request):
+  return request.config.stash[_recorder_key]
+
+
+# encodeur de l'application s'il a été généré, sinon encodeur calculé sur un dataset nettoyé synthétique
+@pytest.fixture(scope='session')
+def encoder_file(tmp_path_factory):
+  from machine_learning.encoders import FeatureEncoder
+  from tests.synthetic import cleaned_frame, raw_frame
+
+  path = os.path.join(root_dir, 'encoders.joblib')
+  if os.path.exists(path):
+    return path
+  path = str(tmp_path_factory.mktemp('artifacts') / 'encoders.joblib')
+  FeatureEncoder.from_dataframe(cleaned_frame(raw_frame(200_000))).save(path)
+  return path
+
+
+# ralentissement relatif au-delà du seuil et absolu au-delà de min_delta
+def regressions(results, baseline, threshold, min_delta=0.0):
+  slower = []
+  for name, entry in results.items():
+    reference = baseline.get(name)
+    if (reference and entry['seconds'] > reference['seconds'] * (1 + threshold)
+        and entry['seconds'] - reference['seconds'] > min_delta):
+      slower.append((name, reference['seconds'], entry['seconds']))
+  return slower
+
+
+def pytest_sessionfinish(session, exitstatus):
+  config = session.config
+  results = config.stash[_recorder_key].results
+  if not results:
+    return
+
+  report = {'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+            'machine': platform.machine(), 'cpu_count': os.cpu_count(), 'results': results}
+  for path in [config.getoption('--bench-output')] + ([config.getoption('--bench-baseline')] if config.getoption('--bench-save-baseline') else []):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+      json.dump(report, f, indent=2)
+
+  baseline_path = config.getoption('--bench-baseline')
+  config._bench_regressions = []
+  if not config.getoption('--bench-save-baseline') and os.path.exists(baseline_path):
+    with open(baseline_path, encoding='utf-8') as f:
+      baseline = json.load(f)['results']
+    config._bench_regressions = regressions(results, baseline, config.getoption('--bench-threshold'),
+                                            config.getoption('--bench-min-delta'))
+    if config._bench_regressions and session.exitstatus == pytest.ExitCode.OK:
+      session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+  results = config.stash[_recorder_key].results
+  if not results:
+    return
+  terminalreporter.section('benchmarks')
+  for name, entry in sorted(results.items()):
+    throughput = f"  {entry['rows_per_second']:,.0f} lignes/s" if 'rows_per_second' in entry else ''
+    terminalreporter.line(f"{name:45s} {entry['seconds'] * 1000:10.2f} ms{throughput}")
+  for name, reference, current in getattr(config, '_bench_regressions', []):
+    terminalreporter.line(f"RÉGRESSION {name} : {reference * 1000:.2f} ms -> {current * 1000:.2f} ms", red=True)
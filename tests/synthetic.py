@@ -0,0 +1,73 @@
+# Jeux de données synthétiques au format du fichier brut de l'EEA (mêmes colonnes, casse et alias à nettoyer,
+# NaN sur Enedc / Ewltp, ~98 % de doublons) pour les benchmarks. Les fichiers générés sont mis en cache.
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_processing.constants import values_to_keep, Colname_mapping, excluded_fuels
+from data_processing.dedup import drop_duplicates_streaming
+from data_processing.emissions import add_co2_emissions
+from data_processing.normalization import normalize
+
+cache_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.benchmarks', 'fixtures')
+
+sizes = {'10k': 10_000, '1m': 1_000_000, '10m': 10_000_000}
+
+countries = ['FR', 'FR', 'FR', 'DE', 'IT', 'ES', 'BE', 'PL']
+fuels = ['petrol', 'PETROL', 'Petrol', 'diesel', 'DIESEL', 'PETROL-ELECTRIC', 'DIESEL-ELECTRIC', 'LPG', 'NG', 'E85',
+         'NG-BIOMETHANE', 'ELECTRIC', 'HYDROGEN', 'UNKNOWN', None]
+makes = ['RENAULT', 'Renault', 'PEUGEOT', 'CITROEN', 'ALPINA', 'BMW', 'BMW I', 'PÃ–SSL', 'MERCEDES-AMG', 'MERCEDES-BENZ',
+         'VOLKSWAGEN, VW', 'ROLLS ROYCE', 'HYUNDAI ', 'RENAULT TECH', 'TOYOTA', None]
+
+
+def raw_frame(n_rows, seed=0, duplicate_ratio=0.98):
+  rng = np.random.default_rng(seed)
+  n_unique = max(int(n_rows * (1 - duplicate_ratio)), 10)
+  rows = rng.integers(0, n_unique, n_rows)
+
+  def pick(values):
+    return np.asarray(values, dtype=object)[rng.integers(0, len(values), n_unique)][rows]
+
+  def measure(mean, std, missing=0.0):
+    values = rng.normal(mean, std, n_unique).round(0)
+    values[rng.random(n_unique) < missing] = np.nan
+    return values[rows]
+
+  return pd.DataFrame({
+    'ID': np.arange(n_rows),
+    'Country': pick(countries),
+    'Tan': pick([f'e{i % 13}*2007/46*{i:04d}' for i in range(400)]),
+    'T': pick(['AA', 'AB', 'BA', 'F1', 'ZZ']),
+    'Va': pick([f'V{i:03d}' for i in range(300)]),
+    'Mk': pick(makes),
+    'Cn': pick(['CLIO', '208', 'C3', 'X5', 'GOLF', 'YARIS', 'CLASSE A', 'MEGANE']),
+    'Ct': pick(['M1', 'M1G', 'N1']),
+    'm (kg)': measure(1400, 250),
+    'Enedc (g/km)': measure(120, 30, missing=0.4),
+    'Ewltp (g/km)': measure(140, 35, missing=0.5),
+    'W (mm)': measure(2600, 120),
+    'At1 (mm)': measure(1520, 60),
+    'Ft': pick(fuels),
+    'Fm': pick(['M', 'H', 'P', 'B', 'F']),
+    'ec (cm3)': pick([999.0, 1199.0, 1332.0, 1598.0, 1997.0, 2993.0, np.nan]),
+    'ep (KW)': measure(95, 35),
+    'year': rng.integers(2015, 2024, n_unique)[rows],
+  })
+
+
+def raw_csv(size):
+  os.makedirs(cache_dir, exist_ok=True)
+  path = os.path.join(cache_dir, f'eea_raw_{size}.csv')
+  if not os.path.exists(path):
+    raw_frame(sizes[size]).to_csv(path + '.tmp', index=False)
+    os.replace(path + '.tmp', path)
+  return path
+
+
+# étapes de la page 2 appliquées à un DataFrame brut, pour obtenir un dataset nettoyé
+def cleaned_frame(raw):
+  df = raw[raw['Country'] == 'FR']
+  df = df[~df['Ft'].isin(excluded_fuels)][values_to_keep]
+  df, _ = drop_duplicates_streaming([normalize(df)])
+  return add_co2_emissions(df).dropna(axis=0, how='any').rename(columns=Colname_mapping)
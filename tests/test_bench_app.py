@@ -0,0 +1,98 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from tests.conftest import root_dir
+
+app_files = ['streamlit_CO2.py', 'streamlit_assets', 'model_XGBoost.joblib']
+ml_modules = ['xgboost', 'sklearn', 'joblib']
+
+# premier rendu de l'application dans un interpréteur neuf, modules du modèle chargés ou non
+cold_start_script = '''
+import json, sys
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=120).run()
+print(json.dumps({'exception': bool(at.exception), 'loaded': [name for name in sys.argv[2:] if name in sys.modules]}))
+'''
+
+
+# l'application lit ses fichiers depuis le répertoire courant ; sans encoders.joblib à la racine,
+# elle est lancée depuis un répertoire temporaire qui contient l'encodeur synthétique
+@pytest.fixture(scope='module')
+def app_script(encoder_file, tmp_path_factory):
+  if os.path.dirname(encoder_file) == root_dir:
+    app_dir = root_dir
+  else:
+    app_dir = str(tmp_path_factory.mktemp('app'))
+    for name in app_files:
+      os.symlink(os.path.join(root_dir, name), os.path.join(app_dir, name))
+    os.symlink(encoder_file, os.path.join(app_dir, 'encoders.joblib'))
+  previous_dir = os.getcwd()
+  os.chdir(app_dir)
+  yield os.path.join(app_dir, 'streamlit_CO2.py')
+  os.chdir(previous_dir)
+
+
+@pytest.mark.parametrize('page', range(4))
+def test_page_render(bench, app_script, page):
+  at = AppTest.from_file(app_script, default_timeout=120).run()
+  radio = at.sidebar.radio[0]
+  radio.set_value(radio.options[page])
+  bench.measure(f'page_render[{page + 1}]', at.run)
+  assert not at.exception
+
+  if page == 3:
+    at.button[0].click()
+    bench.measure('page_render[4-calcul]', at.run, repeat=1)
+    assert not at.exception and at.info
+
+
+# les pages 1 à 3 (majorité des visites) ne doivent pas importer le modèle
+def test_cold_start(bench, app_script):
+  command = [sys.executable, '-c', cold_start_script, app_script] + ml_modules
+  env = dict(os.environ, PYTHONPATH=root_dir)
+  result = bench.measure('cold_start[page 1]', lambda: subprocess.run(command, capture_output=True, text=True, check=True, env=env),
+                         repeat=1)
+  status = json.loads(result.stdout.strip().splitlines()[-1])
+  assert not status['exception'] and status['loaded'] == []
+
+
+def test_debug_panel(bench, app_script):
+  from machine_learning import instrumentation
+
+  at = AppTest.from_file(app_script, default_timeout=120)
+  at.query_params['debug'] = '1'
+  at.run()
+  radio = at.sidebar.radio[0]
+  radio.set_value(radio.options[3])
+  bench.measure('page_render[4-debug]', at.run)
+  assert not at.exception and at.sidebar.metric
+  sections = at.sidebar.dataframe[0].value['section'].tolist()
+  assert sections[0] == 'render webapp.pages.conclusion' and '· get_predictor' in sections
+  assert 'co2_app_span_seconds_total{span="get_predictor"}' in instrumentation.prometheus_text()
+
+
+# variante générée puis régénérée sur place après le premier affichage : le nouveau contenu est servi
+def test_image_variants_refresh(tmp_path, monkeypatch):
+  from webapp import assets
+
+  monkeypatch.setattr(assets, 'assets_dir', str(tmp_path))
+  monkeypatch.setattr(assets, 'variants_dir', str(tmp_path / 'optimized'))
+  (tmp_path / 'logo.png').write_bytes(b'original')
+  assert assets.image('logo.png', 500) == b'original'
+
+  os.makedirs(assets.variants_dir)
+  variant = assets.variant_path('logo.png', 500)
+  with open(variant, 'wb') as f:
+    f.write(b'variante 1')
+  assert assets.image('logo.png', 500) == b'variante 1'
+
+  with open(variant, 'wb') as f:
+    f.write(b'variante 2')
+  stat = os.stat(variant)
+  os.utime(variant, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+  assert assets.image('logo.png', 500) == b'variante 2'
@@ -0,0 +1,229 @@
+import importlib
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_processing.constants import values_to_keep
+from data_processing.cube import EdaCube, build_cube, cube_measures, cube_tables
+from data_processing.dataset import partition_files, read_partitions
+from data_processing.dedup import drop_duplicates_streaming
+from data_processing.emissions import calculate_emissions, co2_emissions, compute_medians
+from data_processing.normalization import load_mapping, normalize
+from data_processing.pipeline import StageCache, merged_medians, run_pipeline, sketch_partition
+from data_processing.storage import read_dataset, write_compact
+from machine_learning.countries import train_countries
+from machine_learning.encoders import FeatureEncoder
+from tests.synthetic import cleaned_frame, raw_csv, raw_frame, sizes
+
+ingest_eea = importlib.import_module('import.ingest_eea')
+
+
+@pytest.fixture(scope='module')
+def raw(size):
+  return pd.read_csv(raw_csv(size), usecols=values_to_keep + ['Country'])
+
+
+@pytest.fixture(scope='module')
+def normalized(raw):
+  return normalize(raw[values_to_keep])
+
+
+def test_ingest(size, bench, tmp_path):
+  output_dir = tmp_path / 'eea_parquet'
+  summary = bench.measure(f'ingest[{size}]', lambda: ingest_eea.ingest(raw_csv(size), str(output_dir), overwrite=True),
+                          rows=sizes[size], repeat=1)
+  assert summary['rows'] == sizes[size]
+
+
+# petits morceaux : un seul fichier par partition après regroupement, et un filtre ne touche que ses partitions
+def test_ingest_partitions(size, raw, tmp_path):
+  output_dir = str(tmp_path / 'eea_parquet')
+  summary = ingest_eea.ingest(raw_csv(size), output_dir, chunksize=len(raw) // 7 + 1)
+  for year, country in summary['partitions']:
+    assert os.listdir(ingest_eea.partition_dir(output_dir, year, country)) == ['part-0.parquet']
+
+  files = partition_files(output_dir, [2020, 2021], ['FR', 'DE'])
+  assert sorted(os.path.relpath(os.path.dirname(path), output_dir) for path in files) == [
+    os.path.join(f'year={year}', f'Country={country}') for year in [2020, 2021] for country in ['DE', 'FR']]
+  df = read_partitions(output_dir, [2020, 2021], ['FR', 'DE'])
+  assert len(df) == (raw['year'].isin([2020, 2021]) & raw['Country'].isin(['FR', 'DE'])).sum()
+
+
+def test_normalization(size, bench, raw):
+  df = raw[values_to_keep]
+  result = bench.measure(f'normalization[{size}]', lambda: normalize(df), rows=len(df))
+  assert isinstance(result['Mk'].dtype, pd.CategoricalDtype)
+
+  mapping = load_mapping()
+  for col in ['Mk', 'Ft']:
+    expected = df[col].astype(object).where(df[col].notna(), 'nan').map(lambda x: x.upper().strip()).replace(mapping['columns'][col])
+    assert (expected.fillna('<NA>') == result[col].astype(object).fillna('<NA>')).all()
+
+
+def test_co2_emissions(size, bench, normalized):
+  medians_enedc, medians_ewltp = compute_medians(normalized)
+  result = bench.measure(f'co2_emissions[{size}]', lambda: co2_emissions(normalized, medians_enedc, medians_ewltp),
+                         rows=len(normalized))
+  if len(normalized) <= sizes['10k']:
+    expected = bench.measure(f'co2_emissions_rowwise[{size}]',
+                             lambda: normalized.apply(calculate_emissions, axis=1, args=(medians_enedc, medians_ewltp)),
+                             rows=len(normalized), repeat=1)
+    assert np.array_equal(expected.to_numpy(dtype='float64'), result.to_numpy(), equal_nan=True)
+
+  # morceau sans aucun carburant renseigné : table d'ajustement vide, ajustement 0 comme la fonction d'origine
+  for ft in [pd.Categorical([np.nan] * 100), np.nan]:
+    no_fuel = normalized.head(100).assign(Ft=ft)
+    medians_enedc, medians_ewltp = compute_medians(no_fuel)
+    expected = no_fuel.apply(calculate_emissions, axis=1, args=(medians_enedc, medians_ewltp))
+    result = co2_emissions(no_fuel, medians_enedc, medians_ewltp)
+    assert np.array_equal(expected.to_numpy(dtype='float64'), result.to_numpy(), equal_nan=True)
+
+
+def test_dedup(size, bench, normalized):
+  chunksize = 100_000
+
+  def run():
+    chunks = (normalized.iloc[start:start + chunksize] for start in range(0, len(normalized), chunksize))
+    return drop_duplicates_streaming(chunks)
+
+  unique, deduplicator = bench.measure(f'dedup[{size}]', run, rows=len(normalized))
+  assert deduplicator.chunk_report()['rows'].sum() == len(normalized)
+  if len(normalized) <= sizes['1m']:
+    assert len(unique) == len(normalized.drop_duplicates())
+
+
+@pytest.fixture(scope='module')
+def eea_dataset(size, tmp_path_factory):
+  output_dir = str(tmp_path_factory.mktemp('cube') / 'eea_parquet')
+  ingest_eea.ingest(raw_csv(size), output_dir, overwrite=True)
+  return output_dir
+
+
+def test_cube(size, bench, raw, eea_dataset):
+  cube = bench.measure(f'cube_build[{size}]', lambda: build_cube(eea_dataset), rows=len(raw), repeat=1)
+  assert cube.counts['vehicles'].sum() == len(raw)
+
+  selection = cube.select(countries=['FR'])
+  stats = bench.measure(f'cube_query[{size}]', lambda: selection.quantiles('Ewltp (g/km)', ['year', 'Ft']))
+  if len(raw) <= sizes['1m']:
+    unique = normalize(raw).drop_duplicates(values_to_keep + ['Country'])
+    unique = unique[unique['Country'] == 'FR'].dropna(subset=['Ft'])
+    expected = unique.groupby(['year', 'Ft'], observed=True)['Ewltp (g/km)'].quantile([0.05, 0.25, 0.5, 0.75, 0.95]).unstack().dropna()
+    result = stats.set_index(['year', 'Ft']).loc[expected.index, ['p5', 'p25', 'p50', 'p75', 'p95']]
+    assert cube.counts['variants'].sum() == len(normalize(raw).drop_duplicates(values_to_keep + ['Country']))
+    assert np.allclose(result.to_numpy(), expected.to_numpy(), equal_nan=True)
+
+
+# mesures non entières (puissance au dixième de kW) : quantiles du cube identiques à ceux des lignes
+def test_cube_fractional_measures(raw):
+  df = raw.head(sizes['10k']).assign(**{'ep (KW)': lambda frame: frame['ep (KW)'] + np.random.default_rng(0).integers(0, 10, len(frame)) / 10})
+  cube = EdaCube.build([df[values_to_keep + ['Country']]])
+  unique = normalize(df[values_to_keep + ['Country']]).drop_duplicates(values_to_keep + ['Country']).dropna(subset=['Ft'])
+  expected = unique.groupby('Ft', observed=True)['ep (KW)'].quantile([0.05, 0.25, 0.5, 0.75, 0.95]).unstack().dropna()
+  result = cube.quantiles('ep (KW)', ['Ft']).set_index('Ft').loc[expected.index, ['p5', 'p25', 'p50', 'p75', 'p95']]
+  assert np.array_equal(result.to_numpy(), expected.to_numpy())
+
+
+# mesures non entières : médianes fusionnées depuis les histogrammes de plusieurs partitions exactement égales à
+# celles de groupby('Ft').median() sur toutes les lignes
+def test_merged_medians_fractional(raw):
+  rng = np.random.default_rng(0)
+  df = normalize(raw[values_to_keep]).assign(**{measure: lambda frame, measure=measure: frame[measure] + rng.random(len(frame)) / 3
+                                                for measure in ['Enedc (g/km)', 'Ewltp (g/km)']})
+  # deux valeurs centrales pour lesquelles (a + b) / 2 et a + (b - a) / 2 diffèrent d'un ulp
+  pair = df.head(2).assign(Ft='LPG', **{'Enedc (g/km)': [6.231837427002522, 16.10003198521739],
+                                        'Ewltp (g/km)': [6.231837427002522, 16.10003198521739]})
+  df = pd.concat([df[df['Ft'] != 'LPG'], pair], ignore_index=True).astype({'Ft': df['Ft'].dtype})
+  sketches = [sketch_partition(df.iloc[i::4]) for i in range(4)]
+  for result, expected in zip(merged_medians(sketches), compute_medians(df)):
+    expected = expected.dropna()
+    assert np.array_equal(result.loc[expected.index.astype(str)].to_numpy(), expected.to_numpy())
+
+
+# 1M véhicules, 100k variantes : au plus une entrée d'histogramme par variante et par mesure, et une sélection
+# (tranches des groupes retenus) identique au filtrage des tables complètes
+def test_cube_select_latency(bench):
+  raw = raw_frame(sizes['1m'], duplicate_ratio=0.9)
+  cube = EdaCube.build([raw[values_to_keep + ['Country']]])
+  variants = int(cube.counts['variants'].sum())
+  assert len(cube.histograms) <= variants * len(cube_measures) and len(cube.pairs) <= variants
+  assert sum(getattr(cube, name).memory_usage(deep=True).sum() for name in cube_tables) < 64 * variants * len(cube_measures)
+
+  filters = {'year': range(2018, 2023), 'Country': ['FR', 'DE'], 'Ft': None, 'Mk': ['RENAULT', 'BMW']}
+  selection = bench.measure('cube_select[1m]', lambda: cube.select(*filters.values()), repeat=20)
+  assert bench.results['cube_select[1m]']['seconds'] < 0.05
+  for name in cube_tables:
+    table = getattr(cube, name)
+    mask = np.logical_and.reduce([table[col].isin(list(values)).to_numpy() for col, values in filters.items() if values is not None])
+    assert table[mask].reset_index(drop=True).equals(getattr(selection, name).reset_index(drop=True))
+
+
+# une nouvelle version de l'année 2022 est publiée : seule la partition concernée est retraitée
+def test_incremental_pipeline(size, bench, raw, tmp_path):
+  dataset, cache_dir = str(tmp_path / 'eea_parquet'), str(tmp_path / 'cache')
+  all_years = range(2010, 2024)
+  ingest_eea.ingest(raw_csv(size), dataset)
+  bench.measure(f'pipeline_full[{size}]', lambda: run_pipeline(dataset, all_years, ['FR'], StageCache(cache_dir)), rows=len(raw), repeat=1)
+  bench.measure(f'pipeline_cached[{size}]', lambda: run_pipeline(dataset, all_years, ['FR'], StageCache(cache_dir)), rows=len(raw), repeat=1)
+
+  update = raw_frame(len(raw) // 5, seed=1).assign(Country='FR', year=2022)
+  update.to_csv(tmp_path / 'eea_2022.csv', index=False)
+  ingest_eea.ingest(str(tmp_path / 'eea_2022.csv'), dataset, update=True)
+  df, report = bench.measure(f'pipeline_update[{size}]', lambda: run_pipeline(dataset, all_years, ['FR'], StageCache(cache_dir)),
+                             rows=len(update), repeat=1)
+  assert report['stages']['partition']['misses'] == 1
+
+  if len(raw) <= sizes['1m']:
+    combined = pd.concat([raw[raw['year'] != 2022], update[raw.columns]], ignore_index=True)
+    expected = cleaned_frame(combined)
+    key = lambda frame: frame.astype(str).sort_values(list(frame.columns)).reset_index(drop=True)
+    assert key(df).equals(key(expected))
+
+
+# tous les pays : partitions nettoyées en parallèle (résultat identique au traitement séquentiel), un modèle par pays
+# ayant assez de variantes et un modèle EU sur l'union
+def test_multi_country(size, bench, raw, tmp_path):
+  dataset = str(tmp_path / 'eea_parquet')
+  all_years = range(2010, 2024)
+  ingest_eea.ingest(raw_csv(size), dataset)
+  serial, _ = run_pipeline(dataset, all_years, None, StageCache(str(tmp_path / 'serial')))
+  parallel, report = bench.measure(f'pipeline_all_countries[{size}]',
+                                   lambda: run_pipeline(dataset, all_years, None, StageCache(str(tmp_path / 'parallel')), workers=2),
+                                   rows=len(raw), repeat=1)
+  assert report['stages']['partition']['misses'] == raw.groupby(['year', 'Country']).ngroups
+  assert parallel.equals(serial)
+
+  # variantes françaises immatriculées aussi en Allemagne : le dataset commun est celui de la France seule
+  copied = str(tmp_path / 'eea_copied.csv')
+  french = raw[raw['Country'] == 'FR']
+  pd.concat([french, french.assign(Country='DE')]).to_csv(copied, index=False)
+  ingest_eea.ingest(copied, str(tmp_path / 'eea_copied'))
+  pooled, _ = run_pipeline(str(tmp_path / 'eea_copied'), all_years, None, StageCache(str(tmp_path / 'copied')))
+  alone, _ = run_pipeline(str(tmp_path / 'eea_copied'), all_years, ['FR'], StageCache(str(tmp_path / 'copied')))
+  assert pooled.equals(alone)
+
+  version_dir, report = bench.measure(f'countries_train[{size}]',
+                                      lambda: train_countries(dataset, years=all_years, workers=2, min_rows=50, cache_root=str(tmp_path / 'parallel'),
+                                                              output_dir=str(tmp_path / 'models')), rows=len(raw), repeat=1)
+  assert set(report['models']) == {'EU'} | set(raw['Country'])
+  trained = [code for code, result in report['models'].items() if not result.get('skipped')]
+  assert 'EU' in trained
+  for code in trained:
+    assert sorted(os.listdir(os.path.join(version_dir, code))) == ['encoders.joblib', 'model_XGBoost.joblib', 'prediction_surface.npz']
+
+
+# dataset nettoyé compact (catégories, float32, int16) : moins de mémoire, même encodeur que depuis le CSV
+def test_compact_storage(size, bench, raw, tmp_path):
+  csv_file, parquet_file = str(tmp_path / 'cleaned.csv'), str(tmp_path / 'cleaned.parquet')
+  cleaned_frame(raw).to_csv(csv_file, index=False)
+  df = bench.measure(f'cleaned_read_csv[{size}]', lambda: pd.read_csv(csv_file), rows=len(raw))
+  write_compact(df, parquet_file)
+  compact = bench.measure(f'cleaned_read_compact[{size}]', lambda: read_dataset(parquet_file), rows=len(raw))
+  assert compact.memory_usage(deep=True).sum() < df.memory_usage(deep=True).sum()
+  assert compact['Reporting_year'].dtype == 'int16'
+  expected, result = FeatureEncoder.from_dataframe(df), FeatureEncoder.from_dataframe(compact)
+  assert np.array_equal(expected.center, result.center) and np.array_equal(expected.scale, result.scale)
+  assert expected.frequencies == result.frequencies
+  assert np.array_equal(expected.encode_frame(df), expected.encode_frame(compact))
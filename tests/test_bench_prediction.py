@@ -0,0 +1,74 @@
+import os
+import warnings
+
+import numpy as np
+import pytest
+
+from machine_learning.features import fuel_types
+from machine_learning.registry import get_predictor
+from tests.conftest import root_dir
+
+
+@pytest.fixture(scope='module')
+def predictor(encoder_file):
+  with warnings.catch_warnings():
+    warnings.simplefilter('ignore')
+    return get_predictor(os.path.join(root_dir, 'model_XGBoost.joblib'), encoder_file)
+
+
+@pytest.fixture(scope='module')
+def encoded_batch(predictor):
+  rng = np.random.default_rng(0)
+  n_rows = 10_000
+  return predictor.encoder.encode(rng.choice(np.array(fuel_types, dtype=object), n_rows),
+                                  np.round(rng.uniform(0.5, 10.0, n_rows), 1), rng.integers(2017, 2023, n_rows))
+
+
+def test_single_row_latency(bench, predictor):
+  bench.measure('predict_single[xgboost]', lambda: predictor.model.predict(predictor.encoder.encode('DIESEL', 1.6, 2022)), repeat=200)
+  result = bench.measure('predict_single[predictor]', lambda: predictor.predict('DIESEL', 1.6, 2022), repeat=200)
+  assert result[0] == predictor.model.predict(predictor.encoder.encode('DIESEL', 1.6, 2022))[0]
+
+
+def test_batch_latency(bench, predictor, encoded_batch):
+  result = bench.measure('predict_batch[10k]', lambda: predictor.predict_encoded(encoded_batch), rows=len(encoded_batch))
+  assert np.array_equal(result, predictor.ensemble.predict(encoded_batch))
+
+
+# les dernières variables ne servent à aucune coupure : la largeur vient du booster, une entrée trop étroite est refusée
+def test_flat_ensemble_unused_features(bench):
+  from xgboost import XGBRegressor
+  from machine_learning.fast_inference import FlatTreeEnsemble
+
+  rng = np.random.default_rng(0)
+  X = rng.normal(size=(2000, 14))
+  X[:, 5:] = 0
+  model = XGBRegressor(n_estimators=50, max_depth=4).fit(X, 2 * X[:, 0] + X[:, 3])
+  ensemble = FlatTreeEnsemble.from_booster(model.get_booster())
+  result = bench.measure('predict_batch[flat, 500]', lambda: ensemble.predict(X[:500]), rows=500)
+  assert ensemble.n_features == 14 and np.array_equal(result, model.predict(X[:500]))
+  with pytest.raises(ValueError):
+    ensemble.predict(X[:500, :5])
+
+
+
+# encodage du calculateur identique à celui de la page 4 d'origine (RobustScaler ajusté, cylindrée en litres) ;
+# une flotte décrite en cm3 est ramenée en litres et donne les mêmes prédictions
+def test_capacity_units(predictor):
+  import pandas as pd
+  from sklearn.preprocessing import RobustScaler
+  from machine_learning.batch_predict import score_chunk
+  from machine_learning.features import col_list, col_num
+
+  scaler = RobustScaler()
+  scaler.center_, scaler.scale_, scaler.n_features_in_ = predictor.encoder.center, predictor.encoder.scale, len(col_num)
+  num_mask = np.where(np.array(col_num) == 'Engine_capacity_cm3', 1.6, np.where(np.array(col_num) == 'Reporting_year', 2022, 0.0))
+  expected = scaler.transform(num_mask.reshape(1, -1))[0]
+  encoded = predictor.encoder.encode('DIESEL', 1.6, 2022)[0]
+  for col in ['Engine_capacity_cm3', 'Reporting_year']:
+    assert encoded[col_list.index(col)] == expected[col_num.index(col)]
+
+  vehicles = pd.DataFrame({'Fuel_type': ['DIESEL', 'PETROL'], 'Reporting_year': [2022, 2019]})
+  litres = score_chunk(vehicles.assign(Engine_capacity_L=[1.6, 1.2]), predictor)
+  cm3 = score_chunk(vehicles.assign(Engine_capacity_cm3=[1600.0, 1200.0]), predictor)
+  assert np.array_equal(litres['CO2_g_km'].to_numpy(), cm3['CO2_g_km'].to_numpy())
@@ -0,0 +1,75 @@
+import os
+
+import joblib
+import numpy as np
+import pytest
+
+from machine_learning.encoders import FeatureEncoder
+from machine_learning.features import fuel_types
+from machine_learning.lookup import PredictionSurface, get_surface
+from machine_learning.registry import get_artifact, get_predictor
+from tests.conftest import regressions
+
+
+@pytest.fixture(scope='module')
+def models(encoder_file):
+  from xgboost import XGBRegressor
+
+  rng = np.random.default_rng(0)
+  n_rows = 2000
+  X = FeatureEncoder.load(encoder_file).encode(rng.choice(np.array(fuel_types, dtype=object), n_rows),
+                                               np.round(rng.uniform(0.5, 10.0, n_rows), 1), rng.integers(2017, 2023, n_rows))
+  y = 100 + 20 * X[:, 0] + rng.normal(0, 5, n_rows)
+  return [XGBRegressor(n_estimators=n_estimators, max_depth=3).fit(X, y) for n_estimators in (5, 20)]
+
+
+def _dump(model, path):
+  joblib.dump(model, path)
+  # date de modification distincte même si les deux écritures tombent dans la même tick d'horloge
+  stat = os.stat(path)
+  os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+# un fichier modèle remplacé est rechargé au prochain appel ; réécrit à l'identique, le prédicteur est conservé
+def test_registry_hot_reload(bench, tmp_path, encoder_file, models):
+  path = str(tmp_path / 'model_XGBoost.joblib')
+  _dump(models[0], path)
+  first = get_predictor(path, encoder_file)
+  assert bench.measure('registry_get_predictor[cached]', lambda: get_predictor(path, encoder_file), repeat=100) is first
+
+  _dump(models[0], path)
+  assert get_predictor(path, encoder_file) is first
+
+  _dump(models[1], path)
+  second = get_predictor(path, encoder_file)
+  assert second.model_sha256 != first.model_sha256 and second.encoder_sha256 == first.encoder_sha256
+  encoded = second.encoder.encode('DIESEL', 1.6, 2022)
+  assert second.predict('DIESEL', 1.6, 2022)[0] == models[1].predict(encoded)[0] != models[0].predict(encoded)[0]
+
+
+# surface précalculée absente ou produite par un autre modèle : grille calculée en mémoire pour le prédicteur courant
+def test_surface_fallback(tmp_path, encoder_file, models):
+  paths = [str(tmp_path / f'model_{i}.joblib') for i in range(2)]
+  for model, path in zip(models, paths):
+    _dump(model, path)
+  old, current = (get_predictor(path, encoder_file) for path in paths)
+  surface_file = str(tmp_path / 'prediction_surface.npz')
+
+  built = get_surface(current, surface_file)
+  assert built.matches(current) and get_surface(current, surface_file) is built
+  assert built.lookup('DIESEL', 1.6, 2022) == np.float32(current.predict('DIESEL', 1.6, 2022)[0])
+
+  PredictionSurface.build(old).save(surface_file)
+  assert get_surface(current, surface_file) is built
+
+  PredictionSurface.build(current).save(surface_file)
+  loaded = get_surface(current, surface_file)
+  assert loaded is get_artifact(surface_file, PredictionSurface.load).value and loaded is not built
+  assert np.array_equal(loaded.values, built.values)
+
+
+def test_regression_floor():
+  baseline = {'fast': {'seconds': 0.0004}, 'slow': {'seconds': 0.2}}
+  results = {'fast': {'seconds': 0.0012}, 'slow': {'seconds': 0.3}}
+  assert [name for name, *_ in regressions(results, baseline, 0.3, min_delta=0.005)] == ['slow']
+  assert [name for name, *_ in regressions(results, baseline, 0.3)] == ['fast', 'slow']
@@ -0,0 +1,98 @@
+import asyncio
+import os
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from machine_learning.registry import get_predictor
+from machine_learning.server import MicroBatcher, create_app
+from tests.conftest import root_dir
+
+model_file = os.path.join(root_dir, 'model_XGBoost.joblib')
+
+
+@pytest.fixture(scope='module')
+def client(encoder_file):
+  from starlette.testclient import TestClient
+
+  with warnings.catch_warnings():
+    warnings.simplefilter('ignore')
+    app = create_app(model_file, encoder_file, max_delay_ms=5.0)
+  # le bloc with exécute le lifespan : la tâche de micro-lots tourne pendant les requêtes
+  with TestClient(app) as client:
+    yield client
+
+
+# requêtes simultanées : regroupées en lots, réponses identiques au prédicteur, latence p99 bornée
+def test_concurrent_requests(bench, client, encoder_file):
+  predictor = get_predictor(model_file, encoder_file)
+  rng = np.random.default_rng(0)
+  vehicles = [{'fuel_type': str(fuel), 'engine_capacity': float(capacity), 'reporting_year': int(year)}
+              for fuel, capacity, year in zip(rng.choice(['DIESEL', 'PETROL', 'PETROL/ELECTRIC'], 400),
+                                              np.round(rng.uniform(0.8, 5.0, 400), 1), rng.integers(2017, 2023, 400))]
+  before = client.get('/metrics').json()
+
+  def send(vehicle):
+    start = time.perf_counter()
+    response = client.post('/predict', json=vehicle)
+    return response, time.perf_counter() - start
+
+  def run():
+    with ThreadPoolExecutor(16) as executor:
+      return list(executor.map(send, vehicles))
+
+  results = bench.measure('server_predict[400 requêtes, 16 clients]', run, rows=len(vehicles), repeat=1)
+  latencies = np.array([seconds for _, seconds in results])
+  bench.results['server_predict[p99]'] = {'seconds': float(np.quantile(latencies, 0.99)), 'repeat': 1}
+
+  assert all(response.status_code == 200 for response, _ in results)
+  expected = predictor.predict(np.array([v['fuel_type'] for v in vehicles], dtype=object),
+                               np.array([v['engine_capacity'] for v in vehicles]),
+                               np.array([v['reporting_year'] for v in vehicles]))
+  assert np.allclose([response.json()['co2_g_km'] for response, _ in results], expected)
+  metrics = client.get('/metrics').json()
+  assert metrics['requests'] - before['requests'] == len(vehicles)
+  assert metrics['batches'] - before['batches'] < len(vehicles)
+  assert np.quantile(latencies, 0.99) < 1.0
+
+
+def test_invalid_requests(client):
+  assert client.post('/predict', json={'fuel_type': 'DIESEL'}).status_code == 400
+  assert client.post('/predict/bulk', json={'vehicles': [{'fuel_type': 'DIESEL', 'engine_capacity': 'x',
+                                                         'reporting_year': 2022}]}).status_code == 400
+  response = client.post('/predict/bulk', json={'vehicles': [{'fuel_type': 'DIESEL', 'engine_capacity': 1.6,
+                                                             'reporting_year': 2022}] * 3})
+  assert response.status_code == 200 and len(response.json()['predictions']) == 3
+
+
+# une erreur pendant un lot n'échoue que les requêtes de ce lot : la tâche continue de servir les suivantes
+def test_batch_error_isolated(encoder_file):
+  predictor = get_predictor(model_file, encoder_file)
+  failures = [True]
+
+  def load_predictor():
+    if failures and failures.pop():
+      raise RuntimeError("prédicteur indisponible")
+    return predictor
+
+  async def scenario():
+    batcher = MicroBatcher(load_predictor, max_delay_ms=1.0)
+    await batcher.start()
+    with pytest.raises(RuntimeError):
+      await batcher.predict(['DIESEL'], [1.6], [2022])
+    # capacité non numérique : la concaténation passe, predict échoue pour ce seul lot
+    with pytest.raises(Exception):
+      await batcher.predict(['DIESEL'], ['x'], [2022])
+    with pytest.raises(ValueError):
+      await batcher.predict(['DIESEL', 'PETROL'], [1.6], [2022])
+    result = await batcher.predict(['DIESEL'], [1.6], [2022])
+    assert not batcher._task.done()
+    await batcher.stop()
+    return result, batcher.metrics
+
+  result, metrics = asyncio.run(scenario())
+  assert result[0] == predictor.predict('DIESEL', 1.6, 2022)[0]
+  assert metrics['failed_batches'] == 2 and metrics['batches'] == 1
@@ -0,0 +1,47 @@
+import json
+import os
+
+from machine_learning.encoders import FeatureEncoder
+from machine_learning.registry import file_sha256
+from machine_learning.train import install, new_version_dir, train
+from tests.synthetic import cleaned_frame, raw_frame
+
+
+# recherche réduite (2 configurations, 3 tours d'élimination successive) sur un dataset nettoyé synthétique
+def test_train_artifacts(bench, tmp_path, monkeypatch):
+  dataset = str(tmp_path / 'cleaned.csv')
+  cleaned_frame(raw_frame(50_000, duplicate_ratio=0.9)).to_csv(dataset, index=False)
+  families = ('XGBoost', 'GradientBoosting')
+  progress = []
+  version_dir, report = bench.measure('train[2 familles, 2 essais]', lambda: train(
+    dataset, families, n_trials=2, workers=1, output_dir=str(tmp_path / 'models'),
+    progress=lambda family, result: progress.append(family)), repeat=1)
+
+  assert progress == list(families)
+  assert sorted(os.listdir(version_dir)) == ['encoders.joblib', 'metrics.json', 'model_GradientBoosting.joblib',
+                                             'model_XGBoost.joblib']
+  with open(os.path.join(version_dir, 'metrics.json'), encoding='utf-8') as f:
+    assert json.load(f) == json.loads(json.dumps(report))
+  assert {'version', 'dataset_sha256', 'seed', 'n_trials', 'rows', 'libraries', 'models'} <= set(report)
+  assert os.path.basename(version_dir) == report['version']
+  for family in families:
+    result = report['models'][family]
+    assert {'best_params', 'rounds', 'val_rmse', 'trials', 'train_r2', 'test_r2', 'test_rmse'} <= set(result)
+    # 2 configurations sur les deux premiers tours, la meilleure seule sur tout le jeu d'entrainement
+    assert [trial['rung'] for trial in result['trials']] == [0, 0, 1, 2]
+    assert result['trials'][-1]['params'] == result['best_params'] and result['test_rmse'] > 0
+
+  # encodeur ajusté sur la partie entrainement : aucune catégorie sans ligne
+  frequencies = FeatureEncoder.load(os.path.join(version_dir, 'encoders.joblib')).frequencies
+  assert all(frequency > 0 for col in frequencies.values() for frequency in col.values())
+
+  monkeypatch.chdir(tmp_path)
+  install(version_dir)
+  for name in ['encoders.joblib', 'model_XGBoost.joblib']:
+    assert file_sha256(name) == file_sha256(os.path.join(version_dir, name))
+
+
+def test_version_dirs_unique(tmp_path):
+  first, _ = new_version_dir(str(tmp_path), 'abcd1234')
+  second, _ = new_version_dir(str(tmp_path), 'abcd1234')
+  assert first != second and sorted(os.listdir(tmp_path)) == sorted([first, second])
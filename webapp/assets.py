@@ -0,0 +1,82 @@
+# Images de l'application servies depuis le répertoire local streamlit_assets (aucun accès réseau).
+# Des variantes WebP redimensionnées aux largeurs d'affichage sont générées au déploiement et leur contenu
+# est gardé en mémoire par le processus ; à défaut de variante, le fichier d'origine est utilisé.
+#
+# Génération des variantes (depuis la racine du projet) :
+#   python -m webapp.assets
+import argparse
+import functools
+import os
+
+from PIL import Image
+
+assets_dir = 'streamlit_assets'
+variants_dir = os.path.join(assets_dir, 'optimized')
+
+# largeurs d'affichage : logos (width=500) et images en pleine largeur de colonne (layout 'wide')
+display_widths = (500, 1200)
+image_extensions = ('.png', '.jpg', '.jpeg')
+
+
+# une variante par largeur d'affichage, jamais agrandie au-delà de l'image d'origine
+def variant_path(name, display_width):
+  return os.path.join(variants_dir, f'{os.path.splitext(name)[0]}.{display_width}.webp')
+
+
+def build_variants(quality=80):
+  os.makedirs(variants_dir, exist_ok=True)
+  written = []
+  for name in sorted(os.listdir(assets_dir)):
+    if not name.lower().endswith(image_extensions):
+      continue
+    with Image.open(os.path.join(assets_dir, name)) as original:
+      original = original.convert('RGBA' if original.mode in ('RGBA', 'LA', 'P') else 'RGB')
+      for display_width in display_widths:
+        width = min(display_width, original.width)
+        height = round(original.height * width / original.width)
+        resized = original if width == original.width else original.resize((width, height), Image.LANCZOS)
+        path = variant_path(name, display_width)
+        resized.save(path, 'WEBP', quality=quality, method=6)
+        written.append(path)
+  return written
+
+
+# clé : chemin et date de modification, une variante régénérée sur place est relue
+@functools.lru_cache(maxsize=128)
+def _read(path, mtime_ns):
+  with open(path, 'rb') as f:
+    return f.read()
+
+
+# plus petite variante au moins aussi large que l'affichage demandé (sinon la plus grande)
+def _variant_for(name, width):
+  candidates = [display_width for display_width in sorted(display_widths) if display_width >= width] or [max(display_widths)]
+  return variant_path(name, candidates[0])
+
+
+# contenu de l'image `name` de streamlit_assets pour un affichage de `width` pixels (pleine colonne par défaut) ;
+# l'existence de la variante est vérifiée à chaque appel : des variantes générées après le démarrage sont servies
+def image(name, width=None):
+  path = _variant_for(name, width or max(display_widths))
+  try:
+    stat = os.stat(path)
+  except FileNotFoundError:
+    path = os.path.join(assets_dir, name)
+    stat = os.stat(path)
+  return _read(path, stat.st_mtime_ns)
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Génération des variantes WebP des images de l'application")
+  parser.add_argument('--quality', type=int, default=80)
+  args = parser.parse_args()
+
+  written = build_variants(args.quality)
+  original = sum(os.path.getsize(os.path.join(assets_dir, name)) for name in os.listdir(assets_dir)
+                 if name.lower().endswith(image_extensions))
+  optimized = sum(os.path.getsize(path) for path in written)
+  print(f"{len(written)} variantes écrites dans {variants_dir} ({original // 1024} Ko -> {optimized // 1024} Ko)")
+
+
+if __name__ == '__main__':
+  main()
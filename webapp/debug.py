@@ -0,0 +1,41 @@
+# Panneau de debug de la barre latérale, affiché avec ?debug=1 dans l'URL : durées de la dernière réexécution,
+# caches Streamlit, mémoire, cumul depuis le démarrage du processus et exports (logs JSON, texte Prometheus).
+import json
+
+import streamlit as st
+
+from machine_learning import instrumentation
+
+
+def enabled():
+  return st.query_params.get('debug', '0').lower() in ('1', 'true', 'yes')
+
+
+def _megabytes(value):
+  return f"{value / 2 ** 20:.0f} Mo"
+
+
+def render_panel(run):
+  with st.sidebar.expander("Debug : performances", expanded=True):
+    st.metric("Dernière réexécution", f"{run['seconds'] * 1000:.1f} ms")
+    st.dataframe([{'section': '· ' * span['depth'] + span['name'], 'ms': round(span['seconds'] * 1000, 2)}
+                  for span in run['spans']], hide_index=True)
+
+    before, after = run['memory_before'], run['memory_after']
+    st.caption(f"Mémoire : {_megabytes(before['rss_bytes'])} -> {_megabytes(after['rss_bytes'])} "
+               f"(maximum {_megabytes(after['max_rss_bytes'])})")
+
+    if run['caches']:
+      st.markdown("**Caches**")
+      st.dataframe([dict(cache=name, **stats) for name, stats in run['caches'].items()], hide_index=True)
+
+    st.markdown("**Cumul du processus**")
+    timings = instrumentation.snapshot()['timings']
+    st.dataframe([{'section': name, 'appels': timing['count'], 'total ms': round(timing['seconds'] * 1000, 1),
+                   'max ms': round(timing['max_seconds'] * 1000, 1)} for name, timing in sorted(timings.items())],
+                 hide_index=True)
+
+    st.download_button("Logs JSON", '\n'.join(json.dumps(run) for run in instrumentation.last_runs()) + '\n',
+                       file_name='co2_app_runs.jsonl', mime='application/json')
+    st.download_button("Métriques Prometheus", instrumentation.prometheus_text(), file_name='co2_app.prom',
+                       mime='text/plain')
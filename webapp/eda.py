@@ -0,0 +1,79 @@
+# Graphiques interactifs de la page 1, calculés à partir du cube d'agrégats (data_processing.cube).
+# Importé par la page seulement si le cube a été construit ; sinon la page affiche les images statiques.
+import pandas as pd
+import streamlit as st
+
+from data_processing.cube import EdaCube, cube_path
+from machine_learning.instrumentation import cached
+
+norms = {'Enedc (g/km)': 'ENEDC', 'Ewltp (g/km)': 'EWLTP'}
+
+
+# cube chargé une seule fois pour toutes les sessions
+@cached('load_cube', st.cache_resource)
+def load_cube():
+  return EdaCube.load(cube_path)
+
+
+# filtres communs aux graphiques de la page : pays, période, constructeurs
+def filters(cube):
+  dimensions = cube.dimensions()
+  col1, col2, col3 = st.columns(3)
+  countries = col1.multiselect("Pays", dimensions['Country'], default=['FR'] if 'FR' in dimensions['Country'] else None,
+                               placeholder="Tous les pays")
+  first_year, last_year = col2.select_slider("Années", dimensions['year'], value=(dimensions['year'][0], dimensions['year'][-1]))
+  makes = col3.multiselect("Constructeurs", dimensions['Mk'], placeholder="Tous les constructeurs")
+  return cube.select(years=range(first_year, last_year + 1), countries=countries or None, makes=makes or None)
+
+
+def year_select(cube, default, key):
+  years = cube.dimensions()['year']
+  return st.selectbox("Année", years, index=years.index(default) if default in years else len(years) - 1, key=key)
+
+
+# boîte à moustaches à partir des quantiles précalculés (moustaches 5 % - 95 %) ; spécification Vega-Lite écrite
+# directement : pas d'import ni de validation altair à chaque réexécution
+def _boxplot(stats, x, y_title, offset=None):
+  encoding = {'x': {'field': x, 'type': 'nominal', 'title': None},
+              'tooltip': [{'field': field} for field in [x] + ([offset] if offset else []) + ['count', 'p5', 'p25', 'p50', 'p75', 'p95']]}
+  if offset:
+    encoding.update(xOffset={'field': offset}, color={'field': offset, 'type': 'nominal'})
+  spec = {'encoding': encoding, 'layer': [
+    {'mark': 'rule', 'encoding': {'y': {'field': 'p5', 'type': 'quantitative', 'title': y_title}, 'y2': {'field': 'p95'}}},
+    {'mark': {'type': 'bar', 'size': 14}, 'encoding': {'y': {'field': 'p25', 'type': 'quantitative'}, 'y2': {'field': 'p75'}}},
+    {'mark': {'type': 'tick', 'color': 'white', 'size': 14, 'thickness': 2}, 'encoding': {'y': {'field': 'p50', 'type': 'quantitative'}}},
+  ]}
+  st.vega_lite_chart(stats, spec)
+
+
+# nombre de variantes renseignées en ENEDC / EWLTP par année
+def norms_by_year(cube):
+  table = cube.measure_counts(['year'], list(norms)).rename(columns=norms)
+  table.index = table.index.astype(str)
+  st.bar_chart(table, stack=False, x_label="Année", y_label="Nombre de variantes")
+
+
+# distribution des émissions par carburant et par norme pour une année
+def norms_boxplot(cube, year):
+  stats = [cube.select(years=[year]).quantiles(measure, ['Ft']).assign(Norme=norm) for measure, norm in norms.items()]
+  _boxplot(pd.concat(stats, ignore_index=True), 'Ft', "CO2 (g/km)", offset='Norme')
+
+
+# couples ENEDC / EWLTP des variantes mesurées selon les deux normes
+def norms_pairs(cube, year):
+  pairs = cube.select(years=[year]).measure_pairs(['Ft'])
+  st.scatter_chart(pairs, x='Enedc (g/km)', y='Ewltp (g/km)', color='Ft', size='n')
+
+
+def vehicles_by_fuel(cube):
+  st.bar_chart(cube.totals(['Ft'])['vehicles'], horizontal=True, x_label="Nombre de véhicules", y_label="Carburant")
+
+
+def vehicles_by_fuel_and_year(cube):
+  table = cube.totals(['year', 'Ft'])['vehicles'].unstack('Ft', fill_value=0)
+  table.index = table.index.astype(str)
+  st.bar_chart(table, x_label="Année", y_label="Nombre de véhicules")
+
+
+def capacity_boxplot(cube):
+  _boxplot(cube.quantiles('ec (cm3)', ['Ft']), 'Ft', "Cylindrée (cm3)")
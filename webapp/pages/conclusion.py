@@ -0,0 +1,115 @@
+# Page 4 - Conclusion et calculateur d'émissions : seule page qui charge le dataset et le modèle.
+# Ce module n'est importé qu'à la première ouverture de la page (registre de streamlit_CO2.py).
+import os
+
+import streamlit as st
+
+from data_processing.constants import country_names
+from data_processing.storage import compact_path, csv_path, read_dataset
+from machine_learning.encoders import FeatureEncoder, encoder_path
+from machine_learning.features import fuel_types
+from machine_learning.instrumentation import cached, span
+from machine_learning.lookup import get_surface, surface_path
+from machine_learning.registry import country_models, get_predictor, model_path
+
+
+# dataset compact (data_processing.storage) chargé une seule fois pour toutes les sessions, gardé 1 heure ;
+# st.cache_resource partage la même instance au lieu d'une copie désérialisée par appel (st.cache_data)
+@cached('load_co2_data', st.cache_resource(ttl=3600))
+def _load_co2_data():
+  return read_dataset(compact_path if os.path.exists(compact_path) else csv_path)
+
+
+# copie superficielle : avec le Copy-on-Write (toujours actif à partir de pandas 3.0, version minimale de
+# requirements.txt) aucune donnée n'est copiée, et une modification faite par l'appelant ne touche pas
+# l'instance partagée
+def load_co2_data():
+  return _load_co2_data().copy(deep=False)
+
+
+# encodeur reconstruit à partir du dataset nettoyé si le fichier encoders.joblib n'a pas encore été généré
+@cached('build_encoder', st.cache_resource)
+def build_encoder():
+  return FeatureEncoder.from_dataframe(load_co2_data())
+
+
+def render():
+  st.header('4 - Conclusion', divider=True)
+  st.markdown("""
+              Pour conclure notre étude sur les émission de CO2 des véhicules, plusieurs points clés émergent:
+              - **Données limitées** : Nous avons exploité les données disponibles depuis 2015, mais leur recul est restreint.
+              - **Surreprésentation des véhicules thermiques** : Notre jeu de données est largement composé de vehicules essence et diesel, ce qui reflète la forte présence de ces motorisation sur les routes.
+              - **Variables influentes pour le rejet de CO2** : Le dimensionnement du véhicule (poids, taille de la cylindrée) et les spécifications du moteur se sont avérés plus significatifs pour prédire les émissions de CO2.
+  """)
+  st.subheader("Tableau des Perspectives d'Amélioration")
+  # Créer les colonnes pour structurer le tableau
+  col1, col2 = st.columns([1, 2])
+  # Ajouter le contenu dans chaque colonne
+  with col1:
+    st.subheader("Domaine")
+    st.write("1. Standardisation des mesures")
+    st.write("2. Modèles d'apprentissage")
+    st.write("3. Étude sur les conditions")
+  with col2:
+    st.subheader("Piste d'amélioration")
+    st.write("1. Uniformiser les données d'émission de CO₂ pour toutes les marques, y compris les véhicules plus récents.")
+    st.write("2. Utiliser des modèles avancés avec optimisation des hyperparamètres pour améliorer la précision.")
+    st.write("3. Intégrer des données sur les conditions de circulation (rurale, urbaine, mixte) pour affiner les prédictions.")
+ 
+  st.divider()
+
+  # Interface utilisateur
+  st.title("Application de calcul des émissions de CO2")
+  st.header("Calculateur d'empreinte carbone pour les véhicules")
+
+  # modèles par pays (machine_learning.countries) s'ils ont été installés ; sans modèle FR installé, la France
+  # utilise le modèle de l'étude (fichiers à la racine)
+  models = country_models()
+  country = 'FR'
+  if models:
+    options = sorted(set(models) | {'FR'})
+    country = st.selectbox("🌍 Pays", options, index=options.index('FR'), format_func=lambda code: country_names.get(code, code))
+
+  # modèle + encodeur chargés une seule fois pour toutes les sessions (rechargés si les fichiers changent)
+  with span('get_predictor'):
+    if country in models:
+      country_model, country_encoder = models[country]
+      predictor = get_predictor(country_model, country_encoder)
+      country_surface = os.path.join(os.path.dirname(country_model), surface_path)
+    else:
+      predictor = get_predictor(model_path, encoder_path, encoder_fallback=build_encoder)
+      country_surface = surface_path
+  # toutes les combinaisons du calculateur prédites à l'avance : un clic = une lecture de tableau
+  with span('get_surface'):
+    surface = get_surface(predictor, country_surface)
+
+  # Entrées utilisateur
+  col1, col2, col3 = st.columns(3)
+
+  with col1:
+    weekly_km = st.slider("📏 Distance moyenne hebdomadaire (en km)", 5, 1000, 200, 5)
+    yearly_km = weekly_km * 52
+
+  with col2:
+    fuel_type = st.selectbox("⛽ Type de carburant", fuel_types)
+
+  with col3:
+    engine_capacity = st.slider("🏎️ Cylindrée (en litres)", 0.5, 10.0, 1.6, 0.1)
+
+  reporting_year = st.select_slider("📅 Année d'immatriculation du véhicule", range(2017, 2023), 2022)
+
+  # Bouton de calcul
+  if st.button("Calculer les émissions de CO2"):
+    # Prédiction : lecture dans la surface précalculée (même encodage et même modèle que predictor)
+    with span('lookup'):
+      CO2_emission = surface.lookup(fuel_type, engine_capacity, reporting_year)
+    yearly_emission = CO2_emission * yearly_km / 1000000
+    yearly_average = 103 * yearly_km / 1000000
+
+    # Affichage des résultats
+    st.header("Résultats")
+    st.info(f"Émissions estimées pour ce véhicule sur {yearly_km} km annuels : {yearly_emission:.2f} tonnes de CO2")
+    st.warning(f"Emissions moyennes en France pour ce même kilométrage : {yearly_average:.2f} tonnes de CO2 (ref. : août 2022)")
+
+  with st.expander("Émissions selon la cylindrée"), span('curves'):
+    st.line_chart(surface.curves(reporting_year), x_label="Cylindrée (L)", y_label="CO2 (g/km)")
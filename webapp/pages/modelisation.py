@@ -0,0 +1,52 @@
+# Page 3 - Modélisation : contenu statique (scores et graphes d'importance), aucun import du modèle.
+import streamlit as st
+
+from webapp.assets import image
+
+
+def render():
+  st.header('3 - Modélisation', divider=True)
+
+  st.markdown("# :grey[Méthodologie]")
+  st.markdown("Nous cherchons à prédire des valeurs continues d'émissions de CO2 et nous allons donc utiliser des modèles de **régression**")
+  st.markdown("Nous avons sélectionné les modèles suivants :")
+  with st.expander("Gradient Boosting Regressor", icon='🔲'):
+    st.image(image('GBMvsXGBoost_logo.png', width=500), width=500)
+    st.markdown("#### GradientBoostingRegressor")
+    code = "Score sur train : 0.9246557461016944\n"
+    code += "Score sur test : 0.9267762036497856"
+    st.code(code)
+    st.markdown("On affiche le graphe de feature importance :")
+    st.image(image('Feature importance GradientBoost.png'))
+
+    st.markdown("#### XGBoost")
+    code = "Score sur train : 0.9784847196200369\n"
+    code += "Score sur test : 0.9762445538965321"
+    st.code(code)
+    st.markdown("On affiche le graphe de feature importance :")
+    st.image(image('Feat_Imp_XGBoost.png'))
+    st.markdown("Le modèle XGBoost obtient de meilleurs scores mais repose quasi totalement sur la variable Fuel_type")
+    st.markdown(":green[**Pour les 2 modèles les scores sur le jeu d’entrainement et sur le jeu de test sont très proches ce qui laisse penser qu’il n’y a pas d’over-fitting**]")
+    
+  # with st.expander("Linear Regressor", icon='🔲'):
+  #    "Les scores obtenus sont"
+  #    "Score sur train : 0.7963421436183908"
+  #    "Score sur test : 0.7902289500042596"
+  #    "Comme Scikit-learn ne fournit pas directement de features importances, nous avons appliqué la méthode des coefficients"
+  #    st.image('streamlit_assets/Feature importance RegressionLineaire.png')
+
+  with st.expander("Random Forest Regressor", icon='🔲'):
+    st.image(image('RandomForest_logo.png', width=500), width=500)
+    st.markdown("Les scores obtenus sont")
+    code = "Score sur train : 0.9941824620769759\n"
+    code += "Score sur test : 0.9879863516148067"
+    st.code(code)
+    st.markdown("On calcule la MSE et RMSE")
+    code = "MSE: 8.783648647914177\n"
+    code += "RMSE: 2.9637220935698707"
+    st.code(code)
+    st.markdown("Ici, cela signifie que le modèle fait, en moyenne, une erreur de prédiction de 2,96 g/km de CO2")
+    st.markdown("On affiche le graphe de feature importance")
+    st.image(image('Feature importance RandomForest.png'))
+    st.markdown("On peut voir que le type de carburant et la puissance du moteur sont les 2 variables principalement utilisées pour la prédiction (66% à elles 2)")
+    st.markdown("Le poids et la cylindrée sont les suivantes (environ 25% à elles 2)")